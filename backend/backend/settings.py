@@ -108,7 +108,11 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'datasets.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 
@@ -132,6 +136,39 @@ FIXTURE_DIRS = (
 
 MEDIA_ROOT = os.getenv('DJANGO_MEDIA_ROOT', './uploads')
 
+# Upper bound in bytes for decoded signal chunks kept in memory per process
+SIGNAL_CHUNK_CACHE_SIZE = int(os.getenv('DJANGO_SIGNAL_CHUNK_CACHE_SIZE', 256 * 1024 * 1024))
+
+# Target size in bytes of uncompressed signal chunk files
+SIGNAL_CHUNK_SIZE = int(os.getenv('DJANGO_SIGNAL_CHUNK_SIZE', 16 * 1024 * 1024))
+
+# Threads per process reading signal chunk files concurrently
+SIGNAL_READ_WORKERS = int(os.getenv('DJANGO_SIGNAL_READ_WORKERS', 4))
+
+# Store interval and tag signals as compressed sample blocks instead of one row per
+# sample, which bypasses the COPY based sample writer and the partitioned samples table
+SIGNAL_PACKED_SAMPLES = os.getenv('DJANGO_SIGNAL_PACKED_SAMPLES', 'false') == 'true'
+
+# Redis database holding encoded samples responses, an empty URL disables the cache
+SIGNAL_RESPONSE_CACHE_URL = os.getenv('DJANGO_SIGNAL_RESPONSE_CACHE_URL', 'redis://redis:6379/1')
+
+# Seconds a cached samples response is kept
+SIGNAL_RESPONSE_CACHE_TIMEOUT = int(os.getenv('DJANGO_SIGNAL_RESPONSE_CACHE_TIMEOUT', 24 * 60 * 60))
+
+# Seconds a request computing a samples response holds off identical ones at most
+SIGNAL_RESPONSE_LOCK_TIMEOUT = float(os.getenv('DJANGO_SIGNAL_RESPONSE_LOCK_TIMEOUT', 30))
+
+# Seconds identical samples requests wait for the one computing the response,
+# before computing it themselves instead of holding a worker thread
+SIGNAL_RESPONSE_MAX_WAIT = float(os.getenv('DJANGO_SIGNAL_RESPONSE_MAX_WAIT', 2))
+
+# Threads per process computing samples responses for neighbouring windows ahead of requests
+SIGNAL_PREFETCH_WORKERS = int(os.getenv('DJANGO_SIGNAL_PREFETCH_WORKERS', 1))
+
+# Prefetched windows a user may have pending per process, further ones are skipped
+SIGNAL_PREFETCH_BUDGET = int(os.getenv('DJANGO_SIGNAL_PREFETCH_BUDGET', 8))
+
+
 # Authentication / Password Validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -0,0 +1,56 @@
+import pandas as pd
+
+AGGREGATE_COLUMNS = ['min', 'max', 'mean', 'count']
+
+
+def aggregate_series(series, window):
+    """
+    Summarises a numeric series into buckets of `window` seconds holding
+    min, max, mean and count. Empty buckets are dropped.
+    """
+    if isinstance(series, pd.DataFrame):
+        series = series.iloc[:, 0]
+
+    resampler = series.resample(f'{window}S')
+    aggregate = pd.DataFrame({
+        'min': resampler.min(),
+        'max': resampler.max(),
+        'mean': resampler.mean(),
+        'count': resampler.count(),
+    })
+    return aggregate[aggregate['count'] > 0]
+
+
+def merge_aggregates(aggregate, offset):
+    """
+    Combines the buckets of an aggregate frame into coarser buckets
+    given as a pandas offset. Means are weighted by the bucket count.
+    """
+    weighted = aggregate['mean'] * aggregate['count']
+    resampler = aggregate.resample(offset)
+    count = resampler['count'].sum()
+    merged = pd.DataFrame({
+        'min': resampler['min'].min(),
+        'max': resampler['max'].max(),
+        'mean': weighted.resample(offset).sum() / count,
+        'count': count,
+    })
+    return merged[merged['count'] > 0]
+
+
+def build_aggregate_levels(series, windows):
+    """
+    Returns a dict mapping each window (in seconds) to its aggregate frame.
+    Windows are processed in ascending order and each coarser level is
+    derived from the previous one, so the raw series is only scanned once.
+    """
+    levels = {}
+    previous = None
+    for window in sorted(windows):
+        if previous is None:
+            aggregate = aggregate_series(series, window)
+        else:
+            aggregate = merge_aggregates(previous, f'{window}S')
+        levels[window] = aggregate
+        previous = aggregate
+    return levels
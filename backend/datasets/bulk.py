@@ -0,0 +1,236 @@
+import csv
+import io
+import os
+import struct
+import numpy as np
+import pandas as pd
+from django.db import connections
+
+# Rows encoded per block, bounds the memory used on top of the series.
+COPY_BLOCK_SIZE = 2 ** 16
+
+# Bytes handed to the connection per read.
+COPY_READ_SIZE = 2 ** 20
+
+# PostgreSQL stores timestamps as microseconds since this epoch.
+POSTGRES_EPOCH = pd.Timestamp('2000-01-01', tz='UTC').value // 1000
+
+BINARY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+BINARY_TRAILER = struct.pack('>h', -1)
+
+# Binary COPY tuple of (timestamp, value, signal_id), each field prefixed
+# by its length in bytes.
+SAMPLE_ROW = np.dtype([
+    ('fields', '>i2'),
+    ('timestamp_length', '>i4'),
+    ('timestamp', '>i8'),
+    ('value_length', '>i4'),
+    ('value', '>f8'),
+    ('signal_length', '>i4'),
+    ('signal', 'V16'),
+])
+
+# Binary COPY tuple of (timestamp, value) as returned for table samples.
+SAMPLE_RECORD = np.dtype([
+    ('fields', '>i2'),
+    ('timestamp_length', '>i4'),
+    ('timestamp', '>i8'),
+    ('value_length', '>i4'),
+    ('value', '>f8'),
+])
+
+
+class BlockReader(io.RawIOBase):
+    """
+    Read-only file object over an iterable of byte blocks, so COPY pulls
+    the encoded rows block by block instead of a fully built buffer.
+    """
+
+    def __init__(self, blocks):
+        self.blocks = iter(blocks)
+        self.block = memoryview(b'')
+        self.offset = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while self.offset >= len(self.block):
+            block = next(self.blocks, None)
+            if block is None:
+                return b''
+            self.block = memoryview(block)
+            self.offset = 0
+        if size < 0:
+            size = len(self.block)
+        data = self.block[self.offset:self.offset + size]
+        self.offset += len(data)
+        return data.tobytes()
+
+
+class SampleDecoder(io.RawIOBase):
+    """
+    Write-only file object receiving a binary COPY of (timestamp, value)
+    tuples. Complete tuples are decoded into native int64 and float64
+    arrays as they arrive, so only the arrays are kept in memory.
+    """
+
+    def __init__(self):
+        self.pending = bytearray()
+        self.header_length = None
+        self.timestamps = []
+        self.values = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.pending += data
+        if self.header_length is None:
+            if len(self.pending) < len(BINARY_HEADER):
+                return len(data)
+            if not self.pending.startswith(BINARY_HEADER[:11]):
+                raise ValueError('Invalid binary COPY header.')
+            extension_length, = struct.unpack_from('>i', self.pending, 15)
+            self.header_length = len(BINARY_HEADER) + extension_length
+        if len(self.pending) < self.header_length:
+            return len(data)
+        if self.header_length:
+            del self.pending[:self.header_length]
+            self.header_length = 0
+
+        count = len(self.pending) // SAMPLE_RECORD.itemsize
+        if count:
+            size = count * SAMPLE_RECORD.itemsize
+            records = np.frombuffer(bytes(self.pending[:size]), dtype=SAMPLE_RECORD)
+            if (records['fields'] != 2).any():
+                raise ValueError('Unexpected tuple in binary COPY.')
+            self.timestamps.append(records['timestamp'].astype(np.int64))
+            self.values.append(records['value'].astype(np.float64))
+            del self.pending[:size]
+        return len(data)
+
+    def to_frame(self):
+        if bytes(self.pending) != BINARY_TRAILER:
+            raise ValueError('Incomplete binary COPY.')
+        timestamps = np.concatenate(self.timestamps or [np.empty(0, np.int64)])
+        values = np.concatenate(self.values or [np.empty(0, np.float64)])
+        index = pd.DatetimeIndex(
+            (timestamps + POSTGRES_EPOCH) * 1000,
+            tz='UTC',
+            name='timestamp',
+        )
+        return pd.DataFrame({'value': values}, index=index)
+
+
+def _utc_index(series):
+    index = series.index
+    if index.tz is None:
+        return index.tz_localize('UTC')
+    return index.tz_convert('UTC')
+
+
+def _sample_blocks(series, signal_id):
+    timestamps = _utc_index(series).asi8 // 1000 - POSTGRES_EPOCH
+    values = series.values.astype(np.float64, copy=False)
+
+    yield BINARY_HEADER
+    for lower in range(0, len(series), COPY_BLOCK_SIZE):
+        upper = min(lower + COPY_BLOCK_SIZE, len(series))
+        rows = np.empty(upper - lower, dtype=SAMPLE_ROW)
+        rows['fields'] = 3
+        rows['timestamp_length'] = 8
+        rows['timestamp'] = timestamps[lower:upper]
+        rows['value_length'] = 8
+        rows['value'] = values[lower:upper]
+        rows['signal_length'] = 16
+        rows['signal'] = signal_id.bytes
+        yield rows.tobytes()
+    yield BINARY_TRAILER
+
+
+def _random_uuids(count):
+    """
+    Returns `count` random version 4 UUIDs as 32 digit hex strings.
+    """
+    uuids = np.frombuffer(os.urandom(16 * count), dtype=np.uint8).reshape(count, 16).copy()
+    uuids[:, 6] = uuids[:, 6] & 0x0f | 0x40
+    uuids[:, 8] = uuids[:, 8] & 0x3f | 0x80
+    return np.frombuffer(uuids.tobytes().hex().encode(), dtype='S32').astype(str)
+
+
+def _tag_blocks(series, signal_id):
+    index = _utc_index(series)
+    for lower in range(0, len(series), COPY_BLOCK_SIZE):
+        upper = min(lower + COPY_BLOCK_SIZE, len(series))
+        rows = pd.DataFrame({
+            'id': _random_uuids(upper - lower),
+            'timestamp': index[lower:upper],
+            'value': series.values[lower:upper],
+            'signal_id': signal_id.hex,
+        })
+        yield rows.to_csv(
+            header=False,
+            index=False,
+            quoting=csv.QUOTE_ALL,
+            date_format='%Y-%m-%d %H:%M:%S.%f+00',
+        ).encode()
+
+
+def _copy(model, columns, options, blocks, using):
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+    column_names = ', '.join(connection.ops.quote_name(column) for column in columns)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {table} ({column_names}) FROM STDIN WITH {options}',
+            BlockReader(blocks),
+            size=COPY_READ_SIZE,
+        )
+
+
+def copy_samples(model, signal_id, series, using='default'):
+    """
+    Inserts a numeric series as Sample rows of a signal using a binary
+    COPY, encoded in blocks straight from the underlying arrays.
+    """
+    _copy(
+        model,
+        ['timestamp', 'value', 'signal_id'],
+        '(FORMAT binary)',
+        _sample_blocks(series, signal_id),
+        using,
+    )
+
+
+def copy_tags(model, signal_id, series, using='default'):
+    """
+    Inserts a text series as Tag rows of a signal using a CSV COPY.
+    Primary keys are generated client side, as the column has no default.
+    """
+    _copy(
+        model,
+        ['id', 'timestamp', 'value', 'signal_id'],
+        '(FORMAT csv)',
+        _tag_blocks(series, signal_id),
+        using,
+    )
+
+
+def read_samples(queryset):
+    """
+    Reads a queryset of (timestamp, value) Sample rows with a binary COPY
+    TO STDOUT. PostgreSQL streams the result, which is decoded into arrays
+    while it arrives, without creating a Python object per row.
+    """
+    connection = connections[queryset.db]
+    sql, params = queryset.query.sql_with_params()
+    decoder = SampleDecoder()
+    with connection.cursor() as cursor:
+        query = cursor.mogrify(sql, params).decode()
+        cursor.copy_expert(
+            f'COPY ({query}) TO STDOUT WITH (FORMAT binary)',
+            decoder,
+            size=COPY_READ_SIZE,
+        )
+    return decoder.to_frame()
@@ -0,0 +1,233 @@
+import logging
+import threading
+import time
+import zlib
+from collections import OrderedDict
+import redis
+from django.conf import settings
+
+from datasets.metrics import Timing
+
+LOGGER = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """
+    Thread-safe least recently used cache bounded by the summed size of
+    its values in bytes.
+    """
+
+    def __init__(self, max_bytes, sizeof):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, predicate):
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                self._bytes -= self._entries.pop(key)[1]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+def dataframe_size(df):
+    return int(df.memory_usage(index=True).sum())
+
+
+# Decoded SignalChunkFile dataframes, keyed by (chunk id, file mtime).
+CHUNK_CACHE = LRUCache(settings.SIGNAL_CHUNK_CACHE_SIZE, dataframe_size)
+
+
+class ResponseCache:
+    """
+    Compressed response bodies shared by all processes through Redis.
+    Connection errors are logged and treated as misses, so responses never
+    depend on the cache being available. After an error, Redis is skipped
+    for `RETRY_INTERVAL` seconds, so that requests do not wait for its
+    timeouts while it is unreachable.
+
+    `get_or_render` coalesces identical requests: the first one renders the
+    response under a Redis lock while the others wait for it to be cached.
+    """
+    # seconds between cache lookups of waiting requests
+    POLL_INTERVAL = 0.05
+    # seconds Redis is skipped after an error
+    RETRY_INTERVAL = 30
+
+    def __init__(self, url, timeout, lock_timeout=30, max_wait=2):
+        self.timeout = timeout
+        self.lock_timeout = lock_timeout
+        self.max_wait = min(max_wait, lock_timeout)
+        self.client = None
+        if url:
+            self.client = redis.Redis.from_url(
+                url,
+                socket_timeout=0.5,
+                socket_connect_timeout=0.5,
+            )
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.coalesced = 0
+        self.wait_timeouts = 0
+        self.waits = Timing()
+        self._retry_at = 0
+        self._lock = threading.Lock()
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def available(self):
+        return self.client is not None and time.monotonic() >= self._retry_at
+
+    def _failed(self, error):
+        LOGGER.warning('Response cache unavailable: %s', error)
+        with self._lock:
+            self.errors += 1
+            self._retry_at = time.monotonic() + self.RETRY_INTERVAL
+
+    def get(self, key):
+        if not self.available():
+            return None
+        try:
+            content = self.client.get(key)
+        except redis.RedisError as error:
+            self._failed(error)
+            return None
+
+        if content is None:
+            self._count('misses')
+            return None
+        self._count('hits')
+        return zlib.decompress(content)
+
+    def set(self, key, content):
+        if not self.available():
+            return
+        try:
+            self.client.set(key, zlib.compress(content, 1), ex=self.timeout)
+        except redis.RedisError as error:
+            self._failed(error)
+
+    def get_or_render(self, key, render):
+        """
+        Returns the cached content for `key` or the content returned by
+        `render`, which is cached. While one request renders a key, others
+        for the same key wait for its result up to `max_wait` seconds and
+        render it themselves if it does not arrive. The wait is kept short,
+        as waiting requests hold their threads, e.g. shared batch workers.
+        """
+        content = self.get(key)
+        if content is not None:
+            return content
+        if not self.available():
+            return render()
+
+        lock = self.client.lock(f'lock:{key}', timeout=self.lock_timeout)
+        try:
+            acquired = lock.acquire(blocking=False)
+        except redis.RedisError as error:
+            self._failed(error)
+            acquired = False
+        else:
+            if not acquired:
+                content = self._wait_for(key, lock)
+                if content is not None:
+                    return content
+
+        try:
+            content = render()
+            self.set(key, content)
+            return content
+        finally:
+            if acquired:
+                try:
+                    lock.release()
+                except redis.RedisError as error:
+                    # expired locks are gone already, others render alone
+                    LOGGER.warning('Response cache lock not released: %s', error)
+
+    def _wait_for(self, key, lock):
+        with self.waits.measure():
+            deadline = time.monotonic() + self.max_wait
+            while time.monotonic() < deadline:
+                time.sleep(self.POLL_INTERVAL)
+                try:
+                    content = self.client.get(key)
+                    if content is None and not lock.locked():
+                        # the rendering request failed, or the cached
+                        # content has expired already
+                        content = self.client.get(key)
+                        if content is None:
+                            return None
+                except redis.RedisError as error:
+                    self._failed(error)
+                    return None
+                if content is not None:
+                    self._count('coalesced')
+                    return zlib.decompress(content)
+        LOGGER.warning('Response cache timed out waiting for %s', key)
+        self._count('wait_timeouts')
+        return None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.client is not None,
+                'available': self.available(),
+                'hits': self.hits,
+                'misses': self.misses,
+                'errors': self.errors,
+                'coalesced': self.coalesced,
+                'wait_timeouts': self.wait_timeouts,
+                'waits': self.waits.stats(),
+            }
+
+
+# Encoded SampleList responses, keyed by signal version and query.
+RESPONSE_CACHE = ResponseCache(
+    settings.SIGNAL_RESPONSE_CACHE_URL,
+    settings.SIGNAL_RESPONSE_CACHE_TIMEOUT,
+    settings.SIGNAL_RESPONSE_LOCK_TIMEOUT,
+    settings.SIGNAL_RESPONSE_MAX_WAIT,
+)
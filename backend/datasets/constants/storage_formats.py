@@ -0,0 +1,15 @@
+PARQUET = 'PQ'
+PARQUET_DELTA = 'PD'
+RAW = 'RA'
+
+CHOICES = [
+    (PARQUET, 'Parquet'),
+    (PARQUET_DELTA, 'Parquet with delta-encoded timestamps'),
+    (RAW, 'Raw binary'),
+]
+
+EXTENSIONS = {
+    PARQUET: 'parquet',
+    PARQUET_DELTA: 'parquet',
+    RAW: 'raw',
+}
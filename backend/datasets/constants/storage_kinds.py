@@ -0,0 +1,7 @@
+CHUNKS = 'chunks'
+BLOCKS = 'blocks'
+SAMPLES = 'samples'
+TAGS = 'tags'
+EMPTY = 'empty'
+
+TABLE_KINDS = (BLOCKS, SAMPLES, TAGS)
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+MINMAX = 'minmax'
+LTTB = 'lttb'
+MODES = (MINMAX, LTTB)
+
+
+def _bucket_bounds(timestamps, width, origin):
+    first_bucket = (timestamps[0] - origin) // width
+    last_bucket = (timestamps[-1] - origin) // width
+    edges = origin + np.arange(first_bucket, last_bucket + 2) * width
+    # the series is sorted, so bucket bounds are found by binary search
+    # instead of computing a bucket per sample
+    bounds = np.searchsorted(timestamps, edges)
+    filled = np.flatnonzero(bounds[1:] > bounds[:-1])
+    starts = bounds[filled]
+    return edges[filled], starts, bounds[filled + 1] - starts
+
+
+def minmax_buckets(series, width, origin=None):
+    """
+    Summarises a time sorted series into buckets of `width` nanoseconds
+    holding min, max and mean in a single pass over the values. Buckets
+    are aligned to `origin` in nanoseconds, by default to midnight of the
+    first day like `resample`. Empty buckets and missing values are dropped.
+    """
+    if isinstance(series, pd.DataFrame):
+        series = series.iloc[:, 0]
+    values = series.values.astype(np.float64, copy=False)
+    timestamps = series.index.asi8
+    if np.isnan(values).any():
+        present = ~np.isnan(values)
+        values = values[present]
+        timestamps = timestamps[present]
+    if not len(values):
+        return pd.DataFrame(columns=['min', 'max', 'mean'], index=series.index[:0])
+
+    if origin is None:
+        origin = series.index[0].normalize().value
+    edges, starts, counts = _bucket_bounds(timestamps, width, origin)
+    return pd.DataFrame({
+        'min': np.minimum.reduceat(values, starts),
+        'max': np.maximum.reduceat(values, starts),
+        'mean': np.add.reduceat(values, starts) / counts,
+    }, index=pd.DatetimeIndex(edges, tz=series.index.tz))
+
+
+def merge_buckets(aggregate, width, origin):
+    """
+    Combines the buckets of a time sorted aggregate frame into coarser
+    buckets of `width` nanoseconds aligned to `origin` in nanoseconds.
+    Means are weighted by the bucket count.
+    """
+    aggregate = aggregate[aggregate['count'] > 0]
+    if aggregate.empty:
+        return pd.DataFrame(columns=['min', 'max', 'mean'], index=aggregate.index[:0])
+
+    edges, starts, _ = _bucket_bounds(aggregate.index.asi8, width, origin)
+    count = aggregate['count'].values
+    return pd.DataFrame({
+        'min': np.minimum.reduceat(aggregate['min'].values, starts),
+        'max': np.maximum.reduceat(aggregate['max'].values, starts),
+        'mean': np.add.reduceat(aggregate['mean'].values * count, starts)
+            / np.add.reduceat(count, starts),
+    }, index=pd.DatetimeIndex(edges, tz=aggregate.index.tz))
+
+
+def lttb(x, y, threshold, weights=None):
+    """
+    Returns the positions of `threshold` points selected by the Largest
+    Triangle Three Buckets algorithm from sorted x and y arrays. The first
+    and last point are always kept, the others are split into equally
+    sized buckets. If `weights` are given, the average point of the next
+    bucket is weighted by them, e.g. by sample durations for irregular
+    series.
+    """
+    length = len(x)
+    if threshold >= length or threshold < 3:
+        return np.arange(length)
+
+    edges = np.linspace(1, length - 1, threshold - 1).astype(np.int64)
+    starts = edges[:-1]
+    if weights is None:
+        weights = np.ones(length)
+    weight_sums = np.add.reduceat(weights[1:-1], starts - 1)
+    weight_sums[weight_sums == 0] = 1
+    average_x = np.append(np.add.reduceat((x * weights)[1:-1], starts - 1) / weight_sums, x[-1])
+    average_y = np.append(np.add.reduceat((y * weights)[1:-1], starts - 1) / weight_sums, y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = length - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        lower, upper = edges[bucket], edges[bucket + 1]
+        next_x, next_y = average_x[bucket + 1], average_y[bucket + 1]
+        areas = np.abs(
+            (x[previous] - next_x) * (y[lower:upper] - y[previous])
+            - (x[previous] - x[lower:upper]) * (next_y - y[previous])
+        )
+        previous = lower + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def lttb_downsample(series, threshold, time_weighted=False):
+    """
+    Returns the `threshold` most visually representative samples of a time
+    sorted series. With `time_weighted`, each sample is weighted by the
+    time until the next one, so dense stretches of irregular series do not
+    dominate the bucket averages.
+    """
+    if isinstance(series, pd.DataFrame):
+        series = series.iloc[:, 0]
+    series = series.dropna()
+    x = series.index.asi8.astype(np.float64)
+    y = series.values.astype(np.float64, copy=False)
+
+    weights = None
+    if time_weighted and len(x) > 1:
+        weights = np.diff(x, append=x[-1])
+        weights[-1] = weights[-2]
+    return series.iloc[lttb(x, y, threshold, weights)]
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import timeit
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from datasets.storage import read_parquet, write_parquet
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares narrow window read latency of single row group chunk files '
+        'with chunk files split into small row groups.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--frequency', type=float, default=256)
+        parser.add_argument('--chunk-length', type=int, default=3600, help='Chunk length in seconds')
+        parser.add_argument('--window', type=float, default=5, help='Read window in seconds')
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        frequency = options['frequency']
+        periods = int(options['chunk_length'] * frequency)
+        index = pd.date_range(
+            start=pd.Timestamp('2020-01-01', tz='UTC'),
+            periods=periods,
+            freq='{}N'.format(int(1e9 / frequency))
+        )
+        series = pd.Series(
+            np.random.randint(-2000, 2000, periods).astype(np.int16),
+            index=index,
+            name='ECG'
+        )
+
+        rng = np.random.default_rng(0)
+        window = pd.Timedelta(seconds=options['window'])
+        offsets = rng.uniform(0, options['chunk_length'] - options['window'], options['repeat'])
+        windows = [
+            (index[0] + pd.Timedelta(seconds=offset), index[0] + pd.Timedelta(seconds=offset) + window)
+            for offset in offsets
+        ]
+
+        with tempfile.TemporaryDirectory() as folder:
+            layouts = {
+                'single row group': periods,
+                'small row groups': None,
+            }
+            for name, row_group_size in layouts.items():
+                path = os.path.join(folder, name.replace(' ', '_') + '.parquet')
+                if row_group_size:
+                    write_parquet(path, series, row_group_size=row_group_size)
+                else:
+                    write_parquet(path, series)
+
+                timings = [
+                    timeit.timeit(lambda: read_parquet(path, start, end), number=1)
+                    for start, end in windows
+                ]
+                self.stdout.write(
+                    f'{name:>18}: {os.path.getsize(path) / 1e6:7.2f} MB, '
+                    f'median {np.median(timings) * 1e3:7.2f} ms, '
+                    f'p95 {np.percentile(timings, 95) * 1e3:7.2f} ms '
+                    f'for {options["window"]}s windows'
+                )
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import timeit
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from datasets.constants import storage_formats
+from datasets.storage import (
+    chunk_length_for, read_parquet, read_raw,
+    write_parquet, write_raw, regular_period, split_chunks
+)
+
+# name, frequency, dtype, storage format
+DEVICE_SIGNALS = [
+    ('Faros ECG', 256, np.int16, storage_formats.RAW),
+    ('Faros accelerometer', 100, np.int16, storage_formats.RAW),
+    ('Empatica E4 BVP', 64, np.float64, storage_formats.RAW),
+    ('Empatica E4 EDA', 4, np.float64, storage_formats.RAW),
+    ('Everion sensor', 51.2, np.float64, storage_formats.RAW),
+    ('Everion heart rate', 1, np.float64, storage_formats.PARQUET),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares file count, size and read latency of fixed one hour chunks '
+        'with size-targeted chunks for typical device signals.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=float, default=1)
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, **options):
+        for name, frequency, dtype, storage_format in DEVICE_SIGNALS:
+            series = self.create_series(frequency, dtype, options['days'])
+            sample_size = series.dtype.itemsize
+            if storage_format != storage_formats.RAW:
+                sample_size += 8
+            lengths = {
+                'fixed': 3600,
+                'adaptive': chunk_length_for(frequency, sample_size, settings.SIGNAL_CHUNK_SIZE),
+            }
+            for layout, chunk_length in lengths.items():
+                with tempfile.TemporaryDirectory() as folder:
+                    chunks = self.write_chunks(folder, series, chunk_length, storage_format)
+                    size = sum(os.path.getsize(path) for path, _, _ in chunks)
+                    full = timeit.timeit(lambda: self.read(chunks, None, None), number=1)
+                    window = self.window_latency(chunks, series, options['repeat'])
+                self.stdout.write(
+                    f'{name:>20} {layout:>8}: {chunk_length:>6}s chunks, '
+                    f'{len(chunks):>4} files, {size / 1e6:8.2f} MB, '
+                    f'full read {full * 1e3:8.1f} ms, '
+                    f'1h window median {window * 1e3:6.1f} ms'
+                )
+
+    def create_series(self, frequency, dtype, days):
+        periods = int(days * 86400 * frequency)
+        index = pd.date_range(
+            start=pd.Timestamp('2020-01-01 08:13:27', tz='UTC'),
+            periods=periods,
+            freq='{}N'.format(int(1e9 / frequency))
+        )
+        values = np.random.default_rng(0).normal(0, 1000, periods).astype(dtype)
+        return pd.Series(values, index=index, name='value')
+
+    def write_chunks(self, folder, series, chunk_length, storage_format):
+        chunks = []
+        for number, chunk in enumerate(split_chunks(series, chunk_length)):
+            period = regular_period(chunk.index)
+            if storage_format == storage_formats.RAW and period:
+                path = os.path.join(folder, f'{number}.raw')
+                write_raw(path, chunk, period)
+                read = read_raw
+            else:
+                path = os.path.join(folder, f'{number}.parquet')
+                write_parquet(path, chunk)
+                read = read_parquet
+            chunks.append((path, read, chunk.index[[0, -1]]))
+        return chunks
+
+    def read(self, chunks, start, end):
+        return pd.concat([
+            read(path, start, end)
+            for path, read, (first, last) in chunks
+            if (start is None or last >= start) and (end is None or first <= end)
+        ])
+
+    def window_latency(self, chunks, series, repeat):
+        rng = np.random.default_rng(1)
+        duration = (series.index[-1] - series.index[0]).total_seconds() - 3600
+        timings = []
+        for offset in rng.uniform(0, max(duration, 0), repeat):
+            start = series.index[0] + pd.Timedelta(seconds=offset)
+            end = start + pd.Timedelta(hours=1)
+            timings.append(timeit.timeit(lambda: self.read(chunks, start, end), number=1))
+        return np.median(timings)
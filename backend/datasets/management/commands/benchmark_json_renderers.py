@@ -0,0 +1,81 @@
+import json
+import timeit
+import plotly.graph_objects as go
+from plotly.utils import PlotlyJSONEncoder
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from datasets import models, serializers
+from datasets.encoding import dumps
+from datasets.renderers import ORJSONRenderer
+from datasets.views import SampleList
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares encoding time of session, analysis and samples responses of '
+        'stored sessions with the DRF JSON renderer and the orjson renderer.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('sessions', nargs='*', help='Session ids, by default the 5 latest sessions')
+        parser.add_argument('--max-samples', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        sessions = models.Session.objects.order_by('-created_at')
+        if options['sessions']:
+            sessions = sessions.filter(id__in=options['sessions'])
+        sessions = list(sessions[:len(options['sessions']) or 5])
+        if not sessions:
+            raise CommandError('No sessions found.')
+
+        payloads = {'session': [], 'analyses': [], 'samples': []}
+        figures = []
+        for session in sessions:
+            payloads['session'].append(serializers.SessionDetailSerializer(session).data)
+            analyses = models.Analysis.objects.filter(signal__dataset__session=session)
+            payloads['analyses'].append(serializers.AnalysisSerializer(analyses, many=True).data)
+            figures += [
+                go.Figure(analysis.result['plot'])
+                for analysis in analyses
+                if analysis.result and analysis.result.get('plot')
+            ]
+            for signal in models.Signal.objects.filter(dataset__session=session):
+                if signal.has_samples():
+                    payloads['samples'].append(self.get_samples_data(signal, options['max_samples']))
+
+        renderers = {'drf json': JSONRenderer(), 'orjson': ORJSONRenderer()}
+        for name, data in payloads.items():
+            for renderer_name, renderer in renderers.items():
+                self.report(
+                    f'{name} ({len(data)} responses)', renderer_name,
+                    lambda: [renderer.render(response) for response in data],
+                    options['repeat']
+                )
+
+        # analysis plots used to be encoded, decoded and encoded again when saved
+        self.report(
+            f'plots ({len(figures)} figures)', 'json round trip',
+            lambda: [json.dumps(json.loads(json.dumps(figure, cls=PlotlyJSONEncoder))) for figure in figures],
+            options['repeat']
+        )
+        self.report(
+            f'plots ({len(figures)} figures)', 'orjson',
+            lambda: [dumps(figure.to_plotly_json()) for figure in figures],
+            options['repeat']
+        )
+
+    def get_samples_data(self, signal, max_samples):
+        request = Request(APIRequestFactory().get('/', {'max_samples': max_samples}))
+        request.accepted_renderer = ORJSONRenderer()
+        view = SampleList()
+        view.request = request
+        view.kwargs = {'signal': signal.id}
+        return view.get_samples_data(request, signal)
+
+    def report(self, name, encoder_name, encode, repeat):
+        duration = min(timeit.repeat(encode, number=1, repeat=repeat))
+        self.stdout.write(f'{name:>28} {encoder_name:>16}: {duration * 1e3:8.2f} ms')
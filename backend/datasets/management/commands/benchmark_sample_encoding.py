@@ -0,0 +1,73 @@
+import timeit
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from datasets.renderers import SampleArrayRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares server-side encoding time and size of samples responses as '
+        'JSON records and as typed arrays.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--points', type=int, default=2000)
+        parser.add_argument('--signals', type=int, default=10, help='Responses per plot')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        points = options['points']
+        index = pd.date_range('2020-01-01', periods=points, freq='s', tz='UTC')
+        x = index.asi8 / 1e6
+        values = np.cumsum(np.random.randn(points))
+        frames = {
+            'raw': pd.DataFrame({'x': x, 'y': values}),
+            'downsampled': pd.DataFrame({
+                'x': x,
+                'min': values - 1,
+                'max': values + 1,
+                'mean': values,
+            }),
+        }
+
+        for name, df in frames.items():
+            def encode_json():
+                records = df.copy()
+                records['x'] = records['x'].round(3)
+                if 'mean' in records:
+                    records['range'] = [
+                        [low, high] for low, high
+                        in zip(records['min'].values, records['max'].values)
+                    ]
+                    records = records[['x', 'range', 'mean']]
+                return JSONRenderer().render({
+                    'downsampled': 'mean' in df,
+                    'window': 1,
+                    'data': records.to_dict('records'),
+                })
+
+            def encode_arrays(dtype):
+                columns = {'x': df['x'].values}
+                for column in df.columns[1:]:
+                    columns[column] = df[column].values.astype(dtype)
+                return SampleArrayRenderer().render({
+                    'downsampled': 'mean' in df,
+                    'window': 1,
+                    'columns': columns,
+                })
+
+            encoders = {
+                'json': encode_json,
+                'float64 arrays': lambda: encode_arrays(np.float64),
+                'float32 arrays': lambda: encode_arrays(np.float32),
+            }
+            for encoder_name, encode in encoders.items():
+                duration = min(timeit.repeat(encode, number=options['signals'], repeat=options['repeat']))
+                self.stdout.write(
+                    f'{name:>12} {encoder_name:>15}: '
+                    f'{duration * 1e3:8.2f} ms for {options["signals"]} responses, '
+                    f'{len(encode()) / 1e3:8.1f} kB each'
+                )
@@ -0,0 +1,138 @@
+import timeit
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+START = '2020-01-01 00:00:00+00'
+
+# (name, table definition, partitioned, statements run after loading)
+LAYOUTS = [
+    (
+        'btree',
+        '''
+        CREATE TABLE {table} (
+            id serial PRIMARY KEY,
+            "timestamp" timestamp with time zone NOT NULL,
+            value double precision NOT NULL,
+            signal_id uuid NOT NULL
+        )
+        ''',
+        False,
+        [
+            'ALTER TABLE {table} ADD UNIQUE (signal_id, "timestamp")',
+            'CREATE INDEX ON {table} (signal_id)',
+        ],
+    ),
+    (
+        'partitioned brin',
+        '''
+        CREATE TABLE {table} (
+            id serial,
+            "timestamp" timestamp with time zone NOT NULL,
+            value double precision NOT NULL,
+            signal_id uuid NOT NULL,
+            PRIMARY KEY (id, signal_id)
+        ) PARTITION BY HASH (signal_id)
+        ''',
+        True,
+        [
+            'CREATE INDEX ON {table} USING brin (signal_id, "timestamp")',
+        ],
+    ),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Loads a synthetic sample table in the previous B-tree layout and in the '
+        'hash partitioned BRIN layout, then compares index sizes and range-read '
+        'latency.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000_000)
+        parser.add_argument('--signals', type=int, default=1000)
+        parser.add_argument('--partitions', type=int, default=16)
+        parser.add_argument('--window', type=int, default=3600, help='Read window in seconds')
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark tables')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('The benchmark requires PostgreSQL.')
+
+        samples_per_signal = options['rows'] // options['signals']
+        rng = np.random.default_rng(0)
+        reads = [
+            (
+                int(rng.integers(options['signals'])),
+                int(rng.integers(max(samples_per_signal - options['window'], 1))),
+            )
+            for _ in range(options['repeat'])
+        ]
+
+        for name, definition, partitioned, statements in LAYOUTS:
+            table = 'benchmark_sample_' + name.replace(' ', '_')
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP TABLE IF EXISTS {table} CASCADE')
+                cursor.execute(definition.format(table=table))
+                if partitioned:
+                    for remainder in range(options['partitions']):
+                        cursor.execute(
+                            f'CREATE TABLE {table}_p{remainder} PARTITION OF {table} '
+                            f'FOR VALUES WITH (MODULUS {options["partitions"]}, REMAINDER {remainder})'
+                        )
+
+                load_time = timeit.timeit(
+                    lambda: self.load(cursor, table, options['signals'], samples_per_signal),
+                    number=1
+                )
+                for statement in statements:
+                    cursor.execute(statement.format(table=table))
+                cursor.execute(f'ANALYZE {table}')
+
+                if partitioned:
+                    cursor.execute(
+                        'SELECT sum(pg_indexes_size(relid)), sum(pg_table_size(relid)) '
+                        'FROM pg_partition_tree(%s::regclass)',
+                        [table]
+                    )
+                else:
+                    cursor.execute(
+                        'SELECT pg_indexes_size(%s::regclass), pg_table_size(%s::regclass)',
+                        [table, table]
+                    )
+                index_size, table_size = cursor.fetchone()
+
+                def read(signal, offset):
+                    cursor.execute(
+                        f'SELECT "timestamp", value FROM {table} '
+                        'WHERE signal_id = md5(%s::text)::uuid '
+                        'AND "timestamp" BETWEEN %s::timestamptz + make_interval(secs => %s) '
+                        'AND %s::timestamptz + make_interval(secs => %s)',
+                        [signal, START, offset, START, offset + options['window']]
+                    )
+                    return cursor.fetchall()
+
+                timings = [timeit.timeit(lambda: read(*arguments), number=1) for arguments in reads]
+
+                if not options['keep']:
+                    cursor.execute(f'DROP TABLE {table} CASCADE')
+
+            self.stdout.write(
+                f'{name:>16}: load {load_time:8.1f} s, '
+                f'table {table_size / 1e6:9.1f} MB, indexes {index_size / 1e6:9.1f} MB, '
+                f'median {np.median(timings) * 1e3:7.2f} ms, '
+                f'p95 {np.percentile(timings, 95) * 1e3:7.2f} ms '
+                f'for {options["window"]}s windows'
+            )
+
+    def load(self, cursor, table, signals, samples_per_signal):
+        # one sample per second, rows of a signal are inserted together like on ingest
+        for signal in range(signals):
+            cursor.execute(
+                f'INSERT INTO {table} ("timestamp", value, signal_id) '
+                'SELECT %s::timestamptz + make_interval(secs => second), random(), md5(%s::text)::uuid '
+                'FROM generate_series(0, %s - 1) AS second',
+                [START, signal, samples_per_signal]
+            )
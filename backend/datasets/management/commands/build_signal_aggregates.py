@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from datasets.models import Signal
+
+
+class Command(BaseCommand):
+    help = 'Builds the min/max/mean aggregate levels of chunked signals.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'signals',
+            nargs='*',
+            help='Ids of signals to process, defaults to all chunked signals.'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rebuild aggregates of signals which already have them.'
+        )
+
+    def handle(self, *args, **options):
+        signals = Signal.objects.filter(signal_chunk_files__isnull=False).distinct()
+        if options['signals']:
+            signals = signals.filter(id__in=options['signals'])
+        if not options['force']:
+            signals = signals.filter(aggregate_files__isnull=True)
+
+        for signal in signals:
+            self.stdout.write(f'Building aggregates for {signal.name} ({signal.id})')
+            # aggregate files are stored in the same time as the chunks, the
+            # pending time correction is applied when they are read
+            signal.save_aggregates(signal.raw_samples_dataframe())
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {len(signals)} signals.'))
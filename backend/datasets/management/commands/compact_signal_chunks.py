@@ -0,0 +1,158 @@
+import os
+import time
+import pandas as pd
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from datasets.cache import dataframe_size
+from datasets.constants import storage_formats
+from datasets.models import ChunkFilesChanged, Signal
+
+
+class Command(BaseCommand):
+    help = (
+        'Merges undersized neighbouring chunk files of signals and rewrites '
+        'them in the current storage format of the signal.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'signals',
+            nargs='*',
+            help='Ids of signals to compact, defaults to all chunked signals.'
+        )
+        parser.add_argument(
+            '--target-size',
+            type=int,
+            default=settings.SIGNAL_CHUNK_SIZE,
+            help='Maximum decoded size of merged chunks in bytes.'
+        )
+        parser.add_argument(
+            '--min-fill',
+            type=float,
+            default=0.5,
+            help='Chunk files smaller than this share of the target size are merged.'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0.1,
+            help='Seconds to pause after each rewritten chunk to limit the load.'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report the chunks which would be merged.'
+        )
+
+    def handle(self, *args, **options):
+        signals = Signal.objects.filter(signal_chunk_files__isnull=False).distinct()
+        if options['signals']:
+            signals = signals.filter(id__in=options['signals'])
+
+        totals = {'files_before': 0, 'files_after': 0, 'bytes_before': 0, 'bytes_after': 0}
+        for signal in signals:
+            try:
+                stats = self.compact(signal, **options)
+            except ChunkFilesChanged:
+                self.stdout.write(self.style.WARNING(
+                    f'{signal.name} ({signal.id}): chunk files were replaced meanwhile, '
+                    'run again to compact them'
+                ))
+                continue
+            for key, value in stats.items():
+                totals[key] += value
+            self.stdout.write(
+                f'{signal.name} ({signal.id}): '
+                f'{stats["files_before"]} -> {stats["files_after"]} files, '
+                f'{stats["bytes_before"]} -> {stats["bytes_after"]} bytes'
+            )
+
+        removed_folders = 0
+        if not options['dry_run']:
+            removed_folders = self.delete_empty_folders(settings.MEDIA_ROOT)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Compacted {len(signals)} signals: '
+            f'{totals["files_before"]} -> {totals["files_after"]} files, '
+            f'{totals["bytes_before"]} -> {totals["bytes_after"]} bytes, '
+            f'removed {removed_folders} empty folders.'
+        ))
+
+    def compact(self, signal, target_size, min_fill, sleep, dry_run, **kwargs):
+        chunk_files = list(signal.signal_chunk_files.all())
+        sizes = {chunk_file.id: os.path.getsize(chunk_file.path.path) for chunk_file in chunk_files}
+        stats = {
+            'files_before': len(chunk_files),
+            'files_after': len(chunk_files),
+            'bytes_before': sum(sizes.values()),
+            'bytes_after': sum(sizes.values()),
+        }
+
+        def merge(run):
+            if not run:
+                return
+            run_files = [chunk_file for chunk_file, _ in run]
+            if len(run) == 1 and self.has_current_format(signal, run_files[0]):
+                return
+            stats['files_after'] -= len(run) - 1
+            if dry_run:
+                return
+            data = pd.concat([
+                df if df is not None else chunk_file.read()
+                for chunk_file, df in run
+            ])
+            if not data.index.is_monotonic_increasing:
+                data = data.sort_index()
+            previous_size = sum(sizes[chunk_file.id] for chunk_file in run_files)
+            new_file = signal.replace_chunk_files(run_files, data)
+            stats['bytes_after'] += os.path.getsize(new_file.path.path) - previous_size
+            time.sleep(sleep)
+
+        run = []
+        run_size = 0
+        for chunk_file in chunk_files:
+            if sizes[chunk_file.id] >= min_fill * target_size:
+                merge(run)
+                merge([(chunk_file, None)])
+                run, run_size = [], 0
+                continue
+
+            df = chunk_file.read()
+            size = dataframe_size(df)
+            if run and run_size + size > target_size:
+                merge(run)
+                run, run_size = [], 0
+            run.append((chunk_file, df))
+            run_size += size
+        merge(run)
+        return stats
+
+    @staticmethod
+    def has_current_format(signal, chunk_file):
+        if chunk_file.format == signal.storage_format:
+            return True
+        # irregular chunks of raw signals fall back to delta encoding
+        return signal.storage_format == storage_formats.RAW \
+            and chunk_file.format == storage_formats.PARQUET_DELTA
+
+    def delete_empty_folders(self, root, min_age=60):
+        """
+        Removes empty folders below `root` left behind by rewritten or
+        deleted files. Recently modified folders are kept, as writers
+        create them right before moving files in.
+        """
+        removed = 0
+        for path, folders, files in os.walk(root, topdown=False):
+            if path == root or files or any(
+                os.path.exists(os.path.join(path, folder)) for folder in folders
+            ):
+                continue
+            if time.time() - os.path.getmtime(path) < min_age:
+                continue
+            try:
+                os.rmdir(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
@@ -0,0 +1,42 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Timing:
+    """
+    Thread-safe counter of how often and how long an operation ran.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(time.perf_counter() - start)
+
+    def add(self, duration):
+        with self._lock:
+            self.count += 1
+            self.total += duration
+            self.maximum = max(self.maximum, duration)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'count': self.count,
+                'total_seconds': self.total,
+                'mean_seconds': self.total / self.count if self.count else 0,
+                'max_seconds': self.maximum,
+            }
+
+
+CHUNK_READS = Timing()
+SIGNAL_READS = Timing()
@@ -0,0 +1,33 @@
+# Generated by Django 2.2.28 on 2026-10-18 20:38
+
+import datasets.utils
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datasets', '0016_auto_20190930_1242'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SignalAggregateFile',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('path', models.FileField(upload_to=datasets.utils.signal_aggregate_file_path)),
+                ('window', models.PositiveIntegerField()),
+                ('signal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aggregate_files', to='datasets.Signal')),
+                ('user', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ('window',),
+                'unique_together': {('signal', 'window')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.28 on 2026-10-18 20:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datasets', '0017_signalaggregatefile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='signal',
+            name='storage_format',
+            field=models.CharField(choices=[('PQ', 'Parquet'), ('RA', 'Raw binary')], default='PQ', max_length=2),
+        ),
+        migrations.AddField(
+            model_name='signalchunkfile',
+            name='format',
+            field=models.CharField(choices=[('PQ', 'Parquet'), ('RA', 'Raw binary')], default='PQ', max_length=2),
+        ),
+    ]
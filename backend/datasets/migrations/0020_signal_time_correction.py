@@ -0,0 +1,29 @@
+# Generated by Django 2.2.28 on 2026-10-18 20:45
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datasets', '0019_parquet_delta_format'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='signal',
+            name='time_reference',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='signal',
+            name='time_shift',
+            field=models.DurationField(default=datetime.timedelta(0)),
+        ),
+        migrations.AddField(
+            model_name='signal',
+            name='time_stretch',
+            field=models.FloatField(default=1),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.28 on 2026-10-18 20:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datasets', '0020_signal_time_correction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SampleBlock',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_timestamp', models.DateTimeField()),
+                ('last_timestamp', models.DateTimeField()),
+                ('count', models.PositiveIntegerField()),
+                ('dtype', models.CharField(max_length=8)),
+                ('timestamps', models.BinaryField()),
+                ('values', models.BinaryField()),
+                ('signal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sample_blocks', to='datasets.Signal')),
+            ],
+            options={
+                'ordering': ('signal', 'first_timestamp'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='sampleblock',
+            index=models.Index(fields=['signal', 'first_timestamp'], name='datasets_sa_signal__1985f5_idx'),
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 2.2.28 on 2026-10-18 20:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+PARTITIONS = 16
+
+# Samples are hash partitioned by signal. Rows of a signal are inserted
+# together and in timestamp order, so a BRIN index on (signal, timestamp)
+# prunes range reads at a fraction of the size of the previous B-tree.
+PARTITION_SQL = [
+    'ALTER TABLE datasets_sample RENAME TO datasets_sample_unpartitioned',
+    '''
+    CREATE TABLE datasets_sample (
+        id integer NOT NULL DEFAULT nextval('datasets_sample_id_seq'),
+        "timestamp" timestamp with time zone NOT NULL,
+        value double precision NOT NULL,
+        signal_id uuid NOT NULL,
+        CONSTRAINT datasets_sample_partitioned_pkey PRIMARY KEY (id, signal_id)
+    ) PARTITION BY HASH (signal_id)
+    ''',
+    'ALTER SEQUENCE datasets_sample_id_seq OWNED BY datasets_sample.id',
+    *[
+        f'''
+        CREATE TABLE datasets_sample_p{remainder} PARTITION OF datasets_sample
+        FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})
+        '''
+        for remainder in range(PARTITIONS)
+    ],
+    '''
+    INSERT INTO datasets_sample (id, "timestamp", value, signal_id)
+    SELECT id, "timestamp", value, signal_id FROM datasets_sample_unpartitioned
+    ORDER BY signal_id, "timestamp"
+    ''',
+    'DROP TABLE datasets_sample_unpartitioned',
+    '''
+    CREATE INDEX datasets_sample_signal_timestamp_brin
+    ON datasets_sample USING brin (signal_id, "timestamp")
+    ''',
+    '''
+    ALTER TABLE datasets_sample ADD CONSTRAINT datasets_sample_signal_id_fk
+    FOREIGN KEY (signal_id) REFERENCES datasets_signal (id) DEFERRABLE INITIALLY DEFERRED
+    ''',
+]
+
+UNPARTITION_SQL = [
+    'ALTER TABLE datasets_sample RENAME TO datasets_sample_partitioned',
+    '''
+    CREATE TABLE datasets_sample (
+        id integer NOT NULL DEFAULT nextval('datasets_sample_id_seq') PRIMARY KEY,
+        "timestamp" timestamp with time zone NOT NULL,
+        value double precision NOT NULL,
+        signal_id uuid NOT NULL REFERENCES datasets_signal (id) DEFERRABLE INITIALLY DEFERRED,
+        UNIQUE (signal_id, "timestamp")
+    )
+    ''',
+    'ALTER SEQUENCE datasets_sample_id_seq OWNED BY datasets_sample.id',
+    '''
+    INSERT INTO datasets_sample (id, "timestamp", value, signal_id)
+    SELECT id, "timestamp", value, signal_id FROM datasets_sample_partitioned
+    ''',
+    'DROP TABLE datasets_sample_partitioned',
+    'CREATE INDEX datasets_sample_signal_id ON datasets_sample (signal_id)',
+]
+
+
+def run_on_postgresql(statements):
+    def run(apps, schema_editor):
+        # other databases keep the plain table
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datasets', '0021_sampleblock'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterModelOptions(
+                    name='sample',
+                    options={},
+                ),
+                migrations.AlterField(
+                    model_name='sample',
+                    name='signal',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='samples', to='datasets.Signal'),
+                ),
+                migrations.AlterUniqueTogether(
+                    name='sample',
+                    unique_together=set(),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(
+                    run_on_postgresql(PARTITION_SQL),
+                    run_on_postgresql(UNPARTITION_SQL),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.28 on 2026-10-18 20:55
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datasets', '0022_partition_sample'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='signal',
+            name='manifest',
+            field=django.contrib.postgres.fields.jsonb.JSONField(blank=True, null=True),
+        ),
+    ]
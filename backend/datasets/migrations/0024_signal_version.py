@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-18 21:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datasets', '0023_signal_manifest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='signal',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.28 on 2026-10-18 21:40
+
+from django.db import migrations
+import datasets.models.analysis
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('datasets', '0024_signal_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='analysis',
+            name='result',
+            field=datasets.models.analysis.ResultField(blank=True, null=True),
+        ),
+    ]
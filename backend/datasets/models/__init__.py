@@ -1,6 +1,6 @@
 from .base import OwnedModel, UUIDModel, User
-from .data import Dataset, Sample, Session, Subject, Signal, Tag
+from .data import ChunkFilesChanged, Dataset, Sample, SampleBlock, Session, Subject, Signal, Tag
 from .source import Source
-from .files import SignalChunkFile, RawFile
+from .files import SignalChunkFile, SignalAggregateFile, RawFile
 from .analysis import Analysis, AnalysisLabel, AnalysisSample, AnalysisSnapshot
 from .processing import ProcessingMethod, Process
@@ -1,8 +1,23 @@
 from django.db import models
 from django.contrib import postgres
+from psycopg2.extras import Json
 
+from datasets.encoding import dumps
 from datasets.models.base import UUIDModel, OwnedModel
 
+
+class ResultField(postgres.fields.JSONField):
+    """
+    JSONField which stores NumPy, pandas and plotly values of analysis
+    results directly, encoding them once with orjson.
+    """
+
+    def get_prep_value(self, value):
+        if value is None:
+            return value
+        return Json(value, dumps=lambda data: dumps(data).decode())
+
+
 class AnalysisSnapshot(OwnedModel, UUIDModel):
     name = models.CharField(max_length=128)
 
@@ -24,7 +39,7 @@ class AnalysisSample(OwnedModel, UUIDModel):
     )
 
 class Analysis(OwnedModel, UUIDModel):
-    result = postgres.fields.JSONField(blank=True, null=True)
+    result = ResultField(blank=True, null=True)
     signal = models.ForeignKey(
         to='datasets.Signal',
         on_delete=models.CASCADE,
@@ -1,15 +1,38 @@
 import logging
+import math
+import os
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+from itertools import islice
+import numpy as np
 import pandas as pd
 from django.apps import apps
-from django.db import models, connections
-from django.db.models import Q, F
+from django.conf import settings
+from django.contrib.postgres import fields as postgres_fields
+from django.db import models, connections, transaction
+from django.db.models import Q, F, Sum
 from django.db.models.expressions import DurationValue
 
 from datasets.models.base import UUIDModel, OwnedModel
-from datasets.constants import signal_types, process_status
+from datasets.constants import signal_types, process_status, storage_formats, storage_kinds
+from datasets.aggregation import build_aggregate_levels
+from datasets.bulk import copy_samples, copy_tags, read_samples
+from datasets.metrics import SIGNAL_READS
+from datasets.storage import (
+    read_chunks, chunk_length_for, split_chunks, pack_samples, unpack_samples
+)
 
 LOGGER = logging.getLogger(__name__)
 
+TIMESTAMP_MIN = pd.Timestamp.min.tz_localize('UTC')
+TIMESTAMP_MAX = pd.Timestamp.max.tz_localize('UTC')
+
+
+class ChunkFilesChanged(Exception):
+    """
+    Raised if chunk files to be replaced were replaced concurrently.
+    """
+
 
 class Subject(OwnedModel, UUIDModel):
     identifier = models.CharField(max_length=32)
@@ -98,113 +121,561 @@ class Signal(OwnedModel, UUIDModel):
     last_timestamp = models.DateTimeField(blank=True, null=True)
     y_min = models.FloatField(blank=True, null=True)
     y_max = models.FloatField(blank=True, null=True)
+    storage_format = models.CharField(
+        max_length=2,
+        choices=storage_formats.CHOICES,
+        default=storage_formats.PARQUET
+    )
+    # Pending time correction, applied to stored timestamps when read:
+    # (timestamp - time_reference) * time_stretch + time_reference + time_shift
+    time_reference = models.DateTimeField(blank=True, null=True)
+    time_stretch = models.FloatField(default=1)
+    time_shift = models.DurationField(default=timedelta(0))
+    # Storage kind, sample count, chunk files as [id, path, first, last, format]
+    # and aggregate files as [id, path, window], timestamps in nanoseconds.
+    # Kept up to date by writes, so reads need no queries to locate files.
+    manifest = postgres_fields.JSONField(blank=True, null=True)
+    # Incremented whenever the samples change, identifies cached responses
+    version = models.PositiveIntegerField(default=0)
 
     def has_samples(self):
-        return self.signal_chunk_files.count() > 0 or self.samples.count() > 0
+        if self.manifest is not None:
+            return self.manifest['kind'] != storage_kinds.EMPTY
+        return self.signal_chunk_files.count() > 0 or self.has_table_samples()
+
+    def has_table_samples(self):
+        if self.manifest is not None:
+            return self.manifest['kind'] in storage_kinds.TABLE_KINDS
+        return self.samples.count() > 0 or self.tags.count() > 0 \
+            or self.sample_blocks.count() > 0
+
+    def update_manifest(self, count=None, save=True):
+        """
+        Rebuilds the manifest from the stored files and rows and increments
+        the version. Chunk counts are not stored per file, so unless `count`
+        is given the previous count is kept.
+        """
+        self.manifest = self.build_manifest(count)
+        # incremented in the database, so concurrent writers never share a version
+        self.version = F('version') + 1
+        if save:
+            self.save(update_fields=['manifest', 'version'])
+            self.refresh_from_db(fields=['version'])
+        return self.manifest
+
+    def build_manifest(self, count=None):
+        chunks = [
+            [str(id), path, pd.Timestamp(first).value, pd.Timestamp(last).value, format]
+            for id, path, first, last, format
+            in self.signal_chunk_files.order_by('first_timestamp')
+                .values_list('id', 'path', 'first_timestamp', 'last_timestamp', 'format')
+        ]
+        aggregates = [
+            [str(id), path, window]
+            for id, path, window
+            in self.aggregate_files.values_list('id', 'path', 'window')
+        ]
+
+        if chunks:
+            kind = storage_kinds.CHUNKS
+            if count is None and self.manifest and self.manifest['kind'] == kind:
+                count = self.manifest['count']
+        elif self.sample_blocks.exists():
+            kind = storage_kinds.BLOCKS
+            count = self.sample_blocks.aggregate(count=Sum('count'))['count']
+        elif self.tags.exists():
+            kind = storage_kinds.TAGS
+            count = self.tags.count()
+        elif self.samples.exists():
+            kind = storage_kinds.SAMPLES
+            count = self.samples.count()
+        else:
+            kind = storage_kinds.EMPTY
+            count = 0
+
+        return {
+            'kind': kind,
+            'count': count,
+            'chunks': chunks,
+            'aggregates': aggregates,
+        }
+
+    def lock(self):
+        """
+        Locks the row of the signal until the end of the current transaction,
+        so that concurrent writers rebuild the manifest one after the other
+        and each sees the files committed by the previous one. Returns the
+        version committed by the previous writer.
+        """
+        return Signal.objects.select_for_update().filter(pk=self.pk).values_list('version', flat=True).get()
+
+    def get_manifest(self):
+        if self.manifest is None:
+            # signals stored before manifests existed get one on first read.
+            # The samples are unchanged, so the version is kept and cached
+            # responses stay valid. Concurrent writers' manifests are kept.
+            manifest = self.build_manifest()
+            Signal.objects.filter(pk=self.pk, manifest__isnull=True).update(manifest=manifest)
+            self.refresh_from_db(fields=['manifest'])
+        return self.manifest
+
+    def manifest_chunk_files(self, start, end):
+        """
+        Returns unsaved SignalChunkFile instances for the manifest chunks
+        overlapping [start, end]. Chunks do not overlap, so both bounds
+        are sorted and located by binary search.
+        """
+        SignalChunkFile = apps.get_model('datasets', 'SignalChunkFile')
+        chunks = self.get_manifest()['chunks']
+        lower = bisect_left([chunk[3] for chunk in chunks], pd.Timestamp(start).value)
+        upper = bisect_right([chunk[2] for chunk in chunks], pd.Timestamp(end).value)
+        return [
+            SignalChunkFile(
+                id=id,
+                path=path,
+                first_timestamp=pd.Timestamp(first, tz='UTC'),
+                last_timestamp=pd.Timestamp(last, tz='UTC'),
+                format=format,
+                signal=self,
+                user_id=self.user_id,
+            )
+            for id, path, first, last, format in chunks[lower:upper]
+        ]
+
+    def get_chunk_length(self, series):
+        frequency = self.frequency
+        if not frequency and len(series) > 1:
+            duration = (series.index.max() - series.index.min()).total_seconds()
+            frequency = len(series) / duration if duration else None
+
+        sample_size = series.dtype.itemsize
+        if self.storage_format != storage_formats.RAW:
+            sample_size += 8 # timestamp column
+        return chunk_length_for(frequency, sample_size, settings.SIGNAL_CHUNK_SIZE)
 
-    def save_to_files(self, series, chunk_length=3600):
+    def save_to_files(self, series, chunk_length=None):
         if self.has_samples():
             raise RuntimeError('Cannot save new series for non-empty signal.')
 
         SignalChunkFile = apps.get_model('datasets', 'SignalChunkFile')
-        lower_bound = series.index.min()
-        lower_bound = lower_bound - pd.Timedelta(
-            microseconds=lower_bound.microsecond
-        )
-        upper_bound = lower_bound + pd.Timedelta(seconds=chunk_length)
+        if chunk_length is None:
+            chunk_length = self.get_chunk_length(series)
+        for chunk in split_chunks(series, chunk_length):
+            signal_file = SignalChunkFile(
+                signal=self,
+                first_timestamp=chunk.index[0],
+                last_timestamp=chunk.index[-1],
+                format=self.storage_format,
+                user_id=self.user_id,
+            )
+            signal_file.save_to_disk(chunk)
+            signal_file.save()
+
+        self.save_aggregates(series)
+
+    def save_aggregates(self, series):
+        SignalAggregateFile = apps.get_model('datasets', 'SignalAggregateFile')
+        self.aggregate_files.all().delete()
 
-        while lower_bound < series.index.max():
-            chunk = series[(series.index >= lower_bound) & (series.index < upper_bound)]
-            if not chunk.empty:
-                signal_file = SignalChunkFile(
+        if isinstance(series, pd.DataFrame):
+            series = series.iloc[:, 0]
+        if not series.empty and np.issubdtype(series.dtype, np.number):
+            levels = build_aggregate_levels(series, SignalAggregateFile.WINDOWS)
+            for window, aggregate in levels.items():
+                aggregate_file = SignalAggregateFile(
                     signal=self,
-                    first_timestamp=chunk.index.min(),
-                    last_timestamp=chunk.index.max(),
+                    window=window,
                     user_id=self.user_id,
                 )
-                signal_file.save_to_disk(chunk)
-                signal_file.save()
-
-            lower_bound = upper_bound
-            upper_bound = lower_bound + pd.Timedelta(seconds=chunk_length)
-
+                aggregate_file.save_to_disk(aggregate)
+                aggregate_file.save()
+
+        self.update_manifest(count=len(series))
+
+    def get_aggregate_file(self, start, end, max_samples):
+        """
+        Returns the coarsest aggregate level which still provides at least
+        `max_samples` buckets between start and end, or None if the raw
+        samples have to be read.
+        """
+        if self.first_timestamp is None or self.last_timestamp is None:
+            return None
+
+        start = max(start, pd.Timestamp(self.first_timestamp))
+        end = min(end, pd.Timestamp(self.last_timestamp))
+        if end <= start or max_samples < 2:
+            return None
+
+        bucket_length = (end - start).total_seconds() / (max_samples - 1)
+        return self.get_coarsest_aggregate_file(bucket_length)
+
+    def get_coarsest_aggregate_file(self, bucket_length):
+        """
+        Returns the coarsest aggregate level with a window of at most
+        `bucket_length` seconds, or None if there is none.
+        """
+        aggregates = [
+            aggregate for aggregate in self.get_manifest()['aggregates']
+            if aggregate[2] <= math.floor(bucket_length)
+        ]
+        if not aggregates:
+            return None
+
+        SignalAggregateFile = apps.get_model('datasets', 'SignalAggregateFile')
+        id, path, window = max(aggregates, key=lambda aggregate: aggregate[2])
+        return SignalAggregateFile(
+            id=id,
+            path=path,
+            window=window,
+            signal=self,
+            user_id=self.user_id,
+        )
 
     def save_to_table(self, series):
         if self.has_samples():
             raise RuntimeError('Cannot save new series for non-empty signal.')
 
+        if settings.SIGNAL_PACKED_SAMPLES:
+            self.save_to_blocks(series)
+            return
+
         if self.type == signal_types.TAGS:
             sample_model = apps.get_model('datasets', 'Tag')
         else:
             sample_model = apps.get_model('datasets', 'Sample')
 
-        samples = [
-            sample_model(
-                timestamp=index,
-                value=value,
-                signal=self
-            )
-            for index, value
-            in series.items()
-        ]
-        sample_model.objects.bulk_create(samples)
+        using = sample_model.objects.db
+        if connections[using].vendor != 'postgresql':
+            sample_model.objects.bulk_create([
+                sample_model(timestamp=index, value=value, signal=self)
+                for index, value
+                in series.items()
+            ])
+        elif self.type == signal_types.TAGS:
+            copy_tags(sample_model, self.id, series, using=using)
+        else:
+            copy_samples(sample_model, self.id, series, using=using)
+        self.update_manifest(count=len(series))
+
+    def save_to_blocks(self, series):
+        if self.has_samples():
+            raise RuntimeError('Cannot save new series for non-empty signal.')
+
+        SampleBlock = apps.get_model('datasets', 'SampleBlock')
+        if not series.index.is_monotonic_increasing:
+            series = series.sort_index()
+
+        blocks = []
+        for lower in range(0, len(series), SampleBlock.SIZE):
+            block = SampleBlock(signal=self)
+            block.pack(series.iloc[lower:lower + SampleBlock.SIZE])
+            blocks.append(block)
+        SampleBlock.objects.bulk_create(blocks)
+        self.update_manifest(count=len(series))
+
+    def has_time_correction(self):
+        return self.time_reference is not None
+
+    def to_raw_time(self, timestamp):
+        if not self.has_time_correction() or timestamp in (TIMESTAMP_MIN, TIMESTAMP_MAX):
+            return timestamp
+        reference = pd.Timestamp(self.time_reference)
+        shifted = pd.Timestamp(timestamp) - pd.Timedelta(self.time_shift)
+        return (shifted - reference) / self.time_stretch + reference
+
+    def to_corrected_time(self, timestamp):
+        if not self.has_time_correction() or timestamp in (TIMESTAMP_MIN, TIMESTAMP_MAX):
+            return timestamp
+        reference = pd.Timestamp(self.time_reference)
+        stretched = (pd.Timestamp(timestamp) - reference) * self.time_stretch + reference
+        return stretched + pd.Timedelta(self.time_shift)
+
+    def apply_time_correction(self, df):
+        if not self.has_time_correction() or df.empty:
+            return df
+        reference = pd.Timestamp(self.time_reference).value
+        shift = pd.Timedelta(self.time_shift).value
+        stretched = np.round((df.index.asi8 - reference) * self.time_stretch).astype(np.int64)
+        df.index = pd.DatetimeIndex(stretched + reference + shift, tz=df.index.tz)
+        return df
 
     def correct_timestamps(self, timeshift=pd.Timedelta(0, 's'), stretch_factor=1, reference_time=None):
+        """
+        Composes the given correction with the pending time correction of the
+        signal. Stored samples are left untouched and corrected when read,
+        until bake_time_correction writes the corrected timestamps.
+        """
         if reference_time is None:
             reference_time = self.first_timestamp
-        if self.signal_chunk_files.count() > 0:
-            for file in self.signal_chunk_files.all():
-                file.correct_timestamps(timeshift, stretch_factor, reference_time)
-            ordered_files = self.signal_chunk_files.all().order_by('first_timestamp')
-            self.first_timestamp = ordered_files.first().first_timestamp
-            self.last_timestamp = ordered_files.last().last_timestamp
+        reference_time = pd.Timestamp(reference_time)
+        timeshift = pd.Timedelta(timeshift)
+
+        def correct(timestamp):
+            return (pd.Timestamp(timestamp) - reference_time) * stretch_factor + reference_time + timeshift
+
+        if self.has_time_correction():
+            # keep the original reference to compose both corrections
+            reference = pd.Timestamp(self.time_reference)
+            self.time_shift = correct(reference + pd.Timedelta(self.time_shift)) - reference
+            self.time_stretch = self.time_stretch * stretch_factor
         else:
-            samples = self.samples
-            if self.tags.count() > 0:
-                samples = self.tags
-            samples.all().update(
-                timestamp=(F('timestamp') - reference_time) * stretch_factor + reference_time + DurationValue(timeshift)
+            self.time_reference = reference_time
+            self.time_shift = timeshift
+            self.time_stretch = stretch_factor
+
+        if self.first_timestamp is not None:
+            self.first_timestamp = correct(self.first_timestamp)
+        if self.last_timestamp is not None:
+            self.last_timestamp = correct(self.last_timestamp)
+        self.version = F('version') + 1
+        # the manifest is left out, it may have been rebuilt concurrently
+        self.save(update_fields=[
+            'time_reference', 'time_stretch', 'time_shift',
+            'first_timestamp', 'last_timestamp', 'version',
+        ])
+        self.refresh_from_db(fields=['version'])
+
+    def bake_time_correction(self):
+        """
+        Rewrites the stored samples with the pending time correction applied
+        and resets it. Corrected chunks and aggregates are written to new
+        files and swapped in a single transaction, so concurrent readers see
+        either version and a rollback leaves the stored files untouched.
+        If the signal changed meanwhile, e.g. by another correction, the new
+        files are discarded and the current correction is baked instead.
+        """
+        self.refresh_from_db(fields=['time_reference', 'time_stretch', 'time_shift', 'version'])
+        if not self.has_time_correction():
+            return
+
+        SignalChunkFile = apps.get_model('datasets', 'SignalChunkFile')
+        version = self.version
+        timeshift = pd.Timedelta(self.time_shift)
+        stretch_factor = self.time_stretch
+        reference_time = pd.Timestamp(self.time_reference)
+
+        previous_files = list(self.signal_chunk_files.all())
+        sample_blocks = list(self.sample_blocks.all())
+        for sample_block in sample_blocks:
+            sample_block.pack(self.apply_time_correction(sample_block.to_frame())['value'])
+
+        baked_files = []
+        for previous_file in previous_files:
+            df = self.apply_time_correction(previous_file.read())
+            signal_file = SignalChunkFile(
+                signal=self,
+                first_timestamp=df.index[0],
+                last_timestamp=df.index[-1],
+                format=previous_file.format,
+                user_id=self.user_id,
             )
-            ordered_samples = samples.all().order_by('timestamp')
-            self.first_timestamp = ordered_samples.first().timestamp
-            self.last_timestamp = ordered_samples.last().timestamp
-        self.save()
+            signal_file.save_to_disk(df)
+            baked_files.append(signal_file)
+
+        previous_aggregates = list(self.aggregate_files.all())
+        baked_aggregates = [
+            aggregate_file.corrected(timeshift, stretch_factor, reference_time)
+            for aggregate_file in previous_aggregates
+        ]
+
+        try:
+            with transaction.atomic():
+                is_current = self.lock() == version
+                if is_current:
+                    for signal_file in baked_files:
+                        signal_file.save()
+                    for signal_file in previous_files:
+                        signal_file.delete()
+                    for aggregate_file in previous_aggregates:
+                        aggregate_file.delete()
+                    for aggregate_file in baked_aggregates:
+                        aggregate_file.save()
+
+                    for sample_block in sample_blocks:
+                        sample_block.save()
+
+                    if not previous_files and not sample_blocks:
+                        samples = self.samples
+                        if self.tags.count() > 0:
+                            samples = self.tags
+                        samples.all().update(
+                            timestamp=(F('timestamp') - reference_time) * stretch_factor \
+                                + reference_time + DurationValue(timeshift)
+                        )
+
+                    self.time_reference = None
+                    self.time_stretch = 1
+                    self.time_shift = timedelta(0)
+                    self.update_manifest(save=False)
+                    self.save(update_fields=['time_reference', 'time_stretch', 'time_shift', 'manifest', 'version'])
+                    self.refresh_from_db(fields=['version'])
+        except Exception:
+            self._remove_files(baked_files + baked_aggregates)
+            raise
+
+        if not is_current:
+            self._remove_files(baked_files + baked_aggregates)
+            self.bake_time_correction()
+
+    @staticmethod
+    def _remove_files(files):
+        for signal_file in files:
+            if os.path.exists(signal_file.path.path):
+                os.remove(signal_file.path.path)
+
+    def replace_chunk_files(self, previous_files, data):
+        """
+        Writes `data` to a single new chunk file in the storage format of
+        the signal and swaps it for `previous_files` in one transaction.
+        The previous files are removed from disk once it is committed. If
+        any of them was replaced meanwhile, e.g. by a bake, `data` is stale
+        and ChunkFilesChanged is raised without changing the signal.
+        """
+        SignalChunkFile = apps.get_model('datasets', 'SignalChunkFile')
+        signal_file = SignalChunkFile(
+            signal=self,
+            first_timestamp=data.index[0],
+            last_timestamp=data.index[-1],
+            format=self.storage_format,
+            user_id=self.user_id,
+        )
+        signal_file.save_to_disk(data)
+
+        try:
+            with transaction.atomic():
+                self.lock()
+                previous_ids = {previous_file.id for previous_file in previous_files}
+                if SignalChunkFile.objects.filter(id__in=previous_ids).count() != len(previous_ids):
+                    raise ChunkFilesChanged(f'Chunk files of signal {self.id} were replaced.')
+                signal_file.save()
+                for previous_file in previous_files:
+                    previous_file.delete()
+                self.update_manifest()
+        except Exception:
+            self._remove_files([signal_file])
+            raise
+        return signal_file
 
     def samples_dataframe(self, start=None, end=None):
         if start is None:
-            start = pd.Timestamp.min.tz_localize('UTC')
+            start = TIMESTAMP_MIN
         if end is None:
-            end = pd.Timestamp.max.tz_localize('UTC')
-
-        if self.signal_chunk_files.count() > 0:
-            LOGGER.debug(
-                'Signal %s with %d chunk files',
-                self.name, self.signal_chunk_files.count()
-            )
-            filtered_files = self.signal_chunk_files \
-                .exclude(Q(last_timestamp__lt=start) | Q(first_timestamp__gt=end))
+            end = TIMESTAMP_MAX
+        df = self.raw_samples_dataframe(self.to_raw_time(start), self.to_raw_time(end))
+        return self.apply_time_correction(df)
+
+    def raw_samples_dataframe(self, start=TIMESTAMP_MIN, end=TIMESTAMP_MAX):
+        """
+        Returns the samples between start and end as stored, without the
+        pending time correction. Both bounds are in stored time as well.
+        """
+        manifest = self.get_manifest()
+        if manifest['kind'] == storage_kinds.CHUNKS:
+            chunk_files = self.manifest_chunk_files(start, end)
             LOGGER.debug(
-                'Signal %s number of matching chunk files: %d}',
-                self.name, len(filtered_files)
+                'Signal %s number of matching chunk files: %d of %d',
+                self.id, len(chunk_files), len(manifest['chunks'])
             )
-            chunks = [f.get_samples(start, end) for f in filtered_files]
+            with SIGNAL_READS.measure():
+                try:
+                    chunks = read_chunks(chunk_files, start, end)
+                except FileNotFoundError:
+                    # chunks were swapped by a concurrent rewrite, the
+                    # current manifest lists their replacements
+                    self.refresh_from_db(fields=['manifest'])
+                    chunks = read_chunks(self.manifest_chunk_files(start, end), start, end)
             if chunks:
                 return pd.concat(chunks)
             return pd.DataFrame()
 
-        value_model = self.samples
-        if self.tags.count() > 0:
-            value_model = self.tags
+        if manifest['kind'] == storage_kinds.BLOCKS:
+            sample_blocks = self.sample_blocks \
+                .exclude(Q(last_timestamp__lt=start) | Q(first_timestamp__gt=end))
+            with SIGNAL_READS.measure():
+                frames = [sample_block.to_frame() for sample_block in sample_blocks]
+            if frames:
+                return pd.concat(frames).truncate(start, end)
+            return pd.DataFrame()
+
+        has_tags = manifest['kind'] == storage_kinds.TAGS
+        value_model = self.tags if has_tags else self.samples
 
         samples = value_model.values_list('timestamp', 'value') \
             .filter(timestamp__gte=start, timestamp__lte=end)
-        sql, params = samples.query.sql_with_params()
-        return pd.read_sql_query(
-            sql, connections[samples.db],
-            params=params,
-            index_col='timestamp',
-            parse_dates=['timestamp']
-        )
+        if not has_tags and connections[samples.db].vendor == 'postgresql':
+            with SIGNAL_READS.measure():
+                df = read_samples(samples)
+        else:
+            sql, params = samples.query.sql_with_params()
+            df = pd.read_sql_query(
+                sql, connections[samples.db],
+                params=params,
+                index_col='timestamp',
+                parse_dates=['timestamp']
+            )
+
+        # samples are selected without ORDER BY, sorting the index is cheaper
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        return df
+
+    def iter_samples(self, start=None, end=None, rows=2 ** 16):
+        """
+        Yields the samples between start and end as time sorted dataframes
+        of one chunk file, sample block or at most `rows` table rows each,
+        so that only one of them is held in memory at a time. Chunk files
+        are read past the chunk cache to keep exports from evicting it.
+        """
+        if start is None:
+            start = TIMESTAMP_MIN
+        if end is None:
+            end = TIMESTAMP_MAX
+        start = self.to_raw_time(start)
+        end = self.to_raw_time(end)
+
+        manifest = self.get_manifest()
+        if manifest['kind'] == storage_kinds.CHUNKS:
+            chunk_files = self.manifest_chunk_files(start, end)
+            while chunk_files:
+                chunk_file = chunk_files.pop(0)
+                try:
+                    df = chunk_file.read(start, end)
+                except FileNotFoundError:
+                    # chunks were swapped by a concurrent rewrite, continue
+                    # with the replacements listed by the current manifest
+                    self.refresh_from_db(fields=['manifest'])
+                    chunk_files = self.manifest_chunk_files(start, end)
+                    continue
+                if not df.empty:
+                    start = df.index[-1] + pd.Timedelta(1, 'ns')
+                    yield self.apply_time_correction(df)
+            return
+
+        if manifest['kind'] == storage_kinds.BLOCKS:
+            sample_blocks = self.sample_blocks \
+                .exclude(Q(last_timestamp__lt=start) | Q(first_timestamp__gt=end))
+            for sample_block in sample_blocks.iterator():
+                df = sample_block.to_frame().truncate(start, end)
+                if not df.empty:
+                    yield self.apply_time_correction(df)
+            return
+
+        value_model = self.tags if manifest['kind'] == storage_kinds.TAGS else self.samples
+        samples = value_model.values_list('timestamp', 'value') \
+            .filter(timestamp__gte=start, timestamp__lte=end) \
+            .order_by('timestamp') \
+            .iterator(chunk_size=rows)
+        while True:
+            batch = list(islice(samples, rows))
+            if not batch:
+                return
+            timestamps, values = zip(*batch)
+            index = pd.DatetimeIndex(timestamps, name='timestamp').tz_convert('UTC')
+            yield self.apply_time_correction(pd.DataFrame({'value': values}, index=index))
+
+    def aggregates_dataframe(self, aggregate_file, start, end):
+        df = aggregate_file.get_samples(self.to_raw_time(start), self.to_raw_time(end))
+        return self.apply_time_correction(df)
 
     def __str__(self):
         return self.name
@@ -223,15 +694,50 @@ class Tag(UUIDModel):
         ordering = ('signal', 'timestamp')
 
 
+class SampleBlock(models.Model):
+    """
+    Up to SIZE consecutive samples of a signal packed into compressed
+    timestamp and value arrays, instead of one Sample or Tag row each.
+    """
+    SIZE = 4096
+
+    first_timestamp = models.DateTimeField()
+    last_timestamp = models.DateTimeField()
+    count = models.PositiveIntegerField()
+    dtype = models.CharField(max_length=8)
+    timestamps = models.BinaryField()
+    values = models.BinaryField()
+    signal = models.ForeignKey(
+        'datasets.Signal',
+        on_delete=models.CASCADE,
+        related_name='sample_blocks'
+    )
+
+    def pack(self, series):
+        self.timestamps, self.values, self.dtype = pack_samples(series)
+        self.first_timestamp = series.index[0]
+        self.last_timestamp = series.index[-1]
+        self.count = len(series)
+
+    def to_frame(self):
+        return unpack_samples(self.timestamps, self.values, self.dtype)
+
+    class Meta:
+        ordering = ('signal', 'first_timestamp')
+        indexes = [models.Index(fields=['signal', 'first_timestamp'])]
+
+
 class Sample(models.Model):
+    """
+    On PostgreSQL the table is hash partitioned by signal with BRIN indexes
+    on (signal, timestamp), see migration 0022. Rows carry no ordering,
+    readers sort the decoded samples.
+    """
     timestamp = models.DateTimeField()
     value = models.FloatField()
     signal = models.ForeignKey(
         'datasets.Signal',
         on_delete=models.CASCADE,
-        related_name='samples'
+        related_name='samples',
+        db_index=False,
     )
-
-    class Meta:
-        unique_together = (('signal', 'timestamp'),)
-        ordering = ('signal', 'timestamp')
@@ -1,13 +1,19 @@
 import os
 import logging
+import numpy as np
 import pandas as pd
-from jointly import Synchronizer
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.dispatch import receiver
 
+from datasets.cache import CHUNK_CACHE
+from datasets.constants import storage_formats
 from datasets.models.base import UUIDModel, OwnedModel
-from datasets.utils import raw_file_path, signal_file_path, delete_empty_folders
+from datasets.storage import (
+    read_parquet, write_parquet, read_parquet_delta, write_parquet_delta,
+    read_raw, write_raw, regular_period
+)
+from datasets.utils import raw_file_path, signal_file_path, signal_aggregate_file_path, delete_empty_folders
 
 LOGGER = logging.getLogger(__name__)
 
@@ -26,9 +32,18 @@ class RawFile(OwnedModel, UUIDModel):
 
 
 class SignalChunkFile(OwnedModel, UUIDModel):
+    # Reads covering at least this share of a chunk decode and cache the
+    # whole file, narrower reads only decode the overlapping row groups.
+    CACHE_MIN_COVERAGE = 0.25
+
     path = models.FileField(upload_to=signal_file_path)
     first_timestamp = models.DateTimeField()
     last_timestamp = models.DateTimeField()
+    format = models.CharField(
+        max_length=2,
+        choices=storage_formats.CHOICES,
+        default=storage_formats.PARQUET
+    )
     signal = models.ForeignKey(
         'datasets.Signal',
         on_delete=models.CASCADE,
@@ -36,50 +51,128 @@ class SignalChunkFile(OwnedModel, UUIDModel):
     )
 
     def get_samples(self, start, end):
-        LOGGER.debug('SignalChunkFile of %s (%s) Reading data', self.signal.name, self.id)
-        df = pd.read_parquet(self.path.path, engine='fastparquet')
-        if self.first_timestamp < start or self.last_timestamp > end:
-            LOGGER.debug('SignalChunkFile of %s (%s) Truncating data', self.signal.name, self.id)
-            df = df.truncate(start, end)
-        return df
-
-    def correct_timestamps(self, timeshift, stretch_factor, reference_time):
-        df = self.get_samples(self.first_timestamp, self.last_timestamp)
-        if stretch_factor != 1:
-            df = Synchronizer._stretch_signals(df, stretch_factor, reference_time)
-        if timeshift != 0:
-            df = df.shift(1, freq=timeshift)
-        self.save_to_disk(df)
-        self.first_timestamp = df.index[0]
-        self.last_timestamp = df.index[-1]
-        self.save()
+        LOGGER.debug('SignalChunkFile of %s (%s) Reading data', self.signal_id, self.id)
+        is_truncated = self.first_timestamp < start or self.last_timestamp > end
+
+        if self.format == storage_formats.RAW:
+            # memory-mapped reads are served from the page cache
+            return self.read(start, end) if is_truncated else self.read()
+
+        key = (self.id, os.stat(self.path.path).st_mtime_ns)
+        df = CHUNK_CACHE.get(key)
+        if df is None:
+            if is_truncated and self.coverage(start, end) < self.CACHE_MIN_COVERAGE:
+                LOGGER.debug('SignalChunkFile of %s (%s) Truncating data', self.signal_id, self.id)
+                return self.read(start, end)
+            df = self.read()
+            CHUNK_CACHE.put(key, df)
+
+        if is_truncated:
+            return df.truncate(start, end)
+        return df.copy()
+
+    def read(self, start=None, end=None):
+        read = {
+            storage_formats.PARQUET: read_parquet,
+            storage_formats.PARQUET_DELTA: read_parquet_delta,
+            storage_formats.RAW: read_raw,
+        }[self.format]
+        return read(self.path.path, start, end)
+
+    def coverage(self, start, end):
+        length = self.last_timestamp - self.first_timestamp
+        if not length:
+            return 1
+        overlap = min(end, self.last_timestamp) - max(start, self.first_timestamp)
+        return max(overlap / length, 0)
 
     def save_to_disk(self, data):
+        period = None
+        if self.format == storage_formats.RAW:
+            values = data.iloc[:, 0] if isinstance(data, pd.DataFrame) else data
+            if np.issubdtype(values.dtype, np.number):
+                period = regular_period(data.index)
+            if period is None:
+                # raw files need a fixed dtype and a regular index
+                self.format = storage_formats.PARQUET_DELTA
+
+        previous_path = self.path.path if self.path else None
         sub_path = signal_file_path(self, None)
         path = os.path.join(settings.MEDIA_ROOT, sub_path)
         self.path = sub_path
 
-        folder = path[:path.rfind('/')]
-        if not os.path.exists(folder):
-            os.makedirs(folder)
-
-        if isinstance(data, pd.Series):
-            data = data.to_frame()
+        if self.format == storage_formats.RAW:
+            write_raw(path, data, period)
+        elif self.format == storage_formats.PARQUET_DELTA:
+            write_parquet_delta(path, data)
+        else:
+            write_parquet(path, data)
 
-        data.to_parquet(
-            path,
-            index=True,
-            engine='fastparquet',
-            compression='SNAPPY',
-        )
+        if previous_path and previous_path != self.path.path and os.path.exists(previous_path):
+            os.remove(previous_path)
+        CHUNK_CACHE.invalidate(lambda key: key[0] == self.id)
 
     class Meta:
         ordering = ('first_timestamp',)
 
+
+class SignalAggregateFile(OwnedModel, UUIDModel):
+    """
+    Precomputed min/max/mean/count buckets of a chunked signal,
+    one file per bucket window.
+    """
+    WINDOWS = (1, 10, 60, 600)
+
+    path = models.FileField(upload_to=signal_aggregate_file_path)
+    window = models.PositiveIntegerField()
+    signal = models.ForeignKey(
+        'datasets.Signal',
+        on_delete=models.CASCADE,
+        related_name='aggregate_files',
+    )
+
+    def get_samples(self, start, end):
+        return read_parquet(self.path.path, start, end)
+
+    def corrected(self, timeshift, stretch_factor, reference_time):
+        """
+        Returns an unsaved aggregate file of the same window, written to a
+        new file holding the buckets with corrected timestamps.
+        """
+        df = read_parquet(self.path.path)
+        if stretch_factor != 1:
+            df.index = (df.index - reference_time) * stretch_factor + reference_time
+        if timeshift != 0:
+            df = df.shift(1, freq=timeshift)
+        aggregate_file = SignalAggregateFile(signal=self.signal, window=self.window, user_id=self.user_id)
+        aggregate_file.save_to_disk(df)
+        return aggregate_file
+
+    def save_to_disk(self, data):
+        sub_path = signal_aggregate_file_path(self, None)
+        self.path = sub_path
+        write_parquet(os.path.join(settings.MEDIA_ROOT, sub_path), data)
+
+    class Meta:
+        ordering = ('window',)
+        unique_together = (('signal', 'window'),)
+
+
 @receiver(models.signals.post_delete, sender=RawFile)
 @receiver(models.signals.post_delete, sender=SignalChunkFile)
+@receiver(models.signals.post_delete, sender=SignalAggregateFile)
 def delete_file(sender, instance, using, **kwargs):
-    if os.path.exists(instance.path.path):
-        os.remove(instance.path.path)
-    folders = instance.path.path[:instance.path.path.rfind('/')]
-    delete_empty_folders(folders, depth=3)
+    path = instance.path.path
+
+    def remove():
+        if os.path.exists(path):
+            os.remove(path)
+        folders = path[:path.rfind('/')]
+        delete_empty_folders(folders, depth=3)
+
+    # keep the file for readers until the deletion is committed
+    transaction.on_commit(remove, using=using)
+
+@receiver(models.signals.post_delete, sender=SignalChunkFile)
+def invalidate_cached_samples(sender, instance, using, **kwargs):
+    CHUNK_CACHE.invalidate(lambda key: key[0] == instance.id)
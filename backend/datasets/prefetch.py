@@ -0,0 +1,109 @@
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from django.conf import settings
+from django.db import connection
+
+LOGGER = logging.getLogger(__name__)
+
+
+# Prefetching clients request windows of GRID_STEPS steps of a power of
+# two milliseconds, starting at a multiple of the step. Neighbours on the
+# same grid are requested with exactly the same bounds after a pan or zoom.
+GRID_STEPS = 3
+
+
+def grid_step(start, end):
+    """
+    Returns the grid step of [start, end] in nanoseconds, or None if the
+    window is not on a prefetch grid.
+    """
+    length = end.value - start.value
+    if length <= 0 or length % GRID_STEPS:
+        return None
+    step = length // GRID_STEPS
+    milliseconds = step // 1000000
+    if step % 1000000 or milliseconds & (milliseconds - 1) or start.value % step:
+        return None
+    return step
+
+
+def neighbour_windows(start, end):
+    """
+    Returns the grid windows most likely requested after [start, end]: the
+    windows one step to the left and right and the ones of the next finer
+    and coarser grid around it. Windows off the grid have no neighbours.
+    """
+    step = grid_step(start, end)
+    if step is None:
+        return []
+
+    origin = start.value
+    windows = [
+        (origin - step, step),
+        (origin + step, step),
+        (origin - origin % (2 * step), 2 * step),
+    ]
+    if step >= 2000000:
+        windows.append((origin + step // 2, step // 2))
+    return [
+        (pd.Timestamp(first, tz='UTC'), pd.Timestamp(first + GRID_STEPS * width, tz='UTC'))
+        for first, width in windows
+    ]
+
+
+class Prefetcher:
+    """
+    Runs prefetch tasks on a few background threads. Each user has at
+    most `budget` tasks pending, further ones are skipped, so prefetching
+    never queues up behind or competes much with requests.
+    """
+
+    def __init__(self, workers, budget):
+        self.budget = budget
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='prefetch')
+        self.pending = Counter()
+        self.submitted = 0
+        self.skipped = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def submit(self, user_id, task):
+        with self._lock:
+            if self.pending[user_id] >= self.budget:
+                self.skipped += 1
+                return False
+            self.pending[user_id] += 1
+            self.submitted += 1
+        self.executor.submit(self._run, user_id, task)
+        return True
+
+    def _run(self, user_id, task):
+        try:
+            task()
+        except Exception:
+            LOGGER.exception('Prefetch failed')
+            with self._lock:
+                self.failed += 1
+        finally:
+            # executor threads would otherwise keep their connections open
+            connection.close()
+            with self._lock:
+                self.pending[user_id] -= 1
+                if not self.pending[user_id]:
+                    del self.pending[user_id]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'submitted': self.submitted,
+                'skipped': self.skipped,
+                'failed': self.failed,
+                'pending': sum(self.pending.values()),
+            }
+
+
+# Warms caches for the neighbours of requested sample windows.
+PREFETCHER = Prefetcher(settings.SIGNAL_PREFETCH_WORKERS, settings.SIGNAL_PREFETCH_BUDGET)
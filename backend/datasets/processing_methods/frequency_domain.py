@@ -1,11 +1,9 @@
-import json
 import pandas as pd
 import numpy as np
 from scipy import signal
 from scipy.interpolate import interp1d
 from astropy.timeseries import LombScargle
 import plotly.graph_objects as go
-from plotly.utils import PlotlyJSONEncoder
 
 from datasets.constants import domain_types
 from datasets.processing_methods.method_base import AnalysisMethodBase
@@ -282,11 +280,11 @@ class FrequencyDomainAnalysis(AnalysisMethodBase):
             name='Above HF'
         ))
 
-        # Return results in JSON compliant format
+        # Return results, the plot is encoded along with them when saved
         return {
             'table': {
                 'columns': ['Variable', 'Unit', 'Value'],
                 'data': table_data.to_dict('records')
             },
-            'plot': json.loads(json.dumps(psd_plot, cls=PlotlyJSONEncoder))
+            'plot': psd_plot.to_plotly_json()
         }
@@ -1,12 +1,10 @@
 import logging
-import json
 import pandas as pd
 import numpy as np
 from scipy import sparse
 from scipy.sparse.linalg import cg
 from scipy.interpolate import interp1d
 import plotly.graph_objects as go
-from plotly.utils import PlotlyJSONEncoder
 
 from datasets.constants import domain_types
 from datasets.processing_methods.method_base import AnalysisMethodBase
@@ -179,11 +177,11 @@ class TimeDomainAnalysis(AnalysisMethodBase):
             hoverinfo='none',
         ))
 
-        # Return results in JSON compliant format
+        # Return results, the plot is encoded along with them when saved
         return {
             'table': {
                 'columns': list(table_data.columns),
                 'data': table_data.to_dict('records')
             },
-            'plot': json.loads(json.dumps(distribution_plot, cls=PlotlyJSONEncoder))
+            'plot': distribution_plot.to_plotly_json()
         }
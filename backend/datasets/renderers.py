@@ -0,0 +1,70 @@
+import json
+import struct
+import numpy as np
+from rest_framework import renderers
+
+from datasets.encoding import dumps
+
+SAMPLE_ARRAY_MAGIC = b'ALPSARR1'
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """
+    Renders JSON with orjson, encoding NumPy and pandas values directly
+    and NaN or infinite floats as null.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        return dumps(data, indent=bool(indent))
+
+
+class SampleArrayRenderer(renderers.BaseRenderer):
+    """
+    Renders sample columns as typed little-endian arrays instead of a list
+    of JSON records. A response is laid out as:
+
+    - 8 bytes: SAMPLE_ARRAY_MAGIC
+    - 4 bytes: length n of the header as little-endian uint32
+    - n bytes: UTF-8 JSON header, padded with spaces so that the arrays
+      start at a multiple of 8 bytes. It holds all non-array fields of the
+      response, the value count and the name and numpy dtype string of
+      each column, e.g. `{"downsampled": true, "window": 5.4, "count": 2000,
+      "columns": [{"name": "x", "dtype": "<f8"}, {"name": "min", ...}]}`
+    - the columns in header order, `count` values each, without gaps
+
+    Errors carry no columns, the header holds the error details.
+    """
+    media_type = 'application/vnd.alps.samples'
+    format = 'bin'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, dict):
+            data = {'detail': data}
+        data = dict(data)
+        columns = data.pop('columns', {})
+        arrays = [
+            np.ascontiguousarray(values, dtype=np.asarray(values).dtype.newbyteorder('<'))
+            for values in columns.values()
+        ]
+
+        header = dict(data)
+        header['count'] = len(arrays[0]) if arrays else 0
+        header['columns'] = [
+            {'name': name, 'dtype': array.dtype.str}
+            for name, array in zip(columns, arrays)
+        ]
+        header = json.dumps(header).encode()
+        prefix_length = len(SAMPLE_ARRAY_MAGIC) + 4
+        header += b' ' * (-(prefix_length + len(header)) % 8)
+
+        return b''.join([
+            SAMPLE_ARRAY_MAGIC,
+            struct.pack('<I', len(header)),
+            header,
+            *(array.tobytes() for array in arrays),
+        ])
@@ -4,6 +4,41 @@ from rest_framework import serializers
 from datasets import models
 from datasets.constants import method_types
 
+class SparseFieldsMixin:
+    """
+    Limits the fields of GET responses to those given as comma separated
+    `fields` query parameter, e.g. `?fields=id,label,process`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+        fields = requested_fields(request)
+        if fields is None:
+            return
+
+        unknown = fields - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError({
+                'fields': [f'Unknown fields: {", ".join(sorted(unknown))}']
+            })
+        for name in set(self.fields) - fields:
+            self.fields.pop(name)
+
+
+def requested_fields(request):
+    """
+    Returns the set of fields of the `fields` query parameter, or None if
+    all fields are requested.
+    """
+    fields = request.query_params.get('fields')
+    if not fields:
+        return None
+    return {field.strip() for field in fields.split(',') if field.strip()}
+
+
 class UserFilteredPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
     def get_queryset(self):
         request = self.context.get('request', None)
@@ -43,7 +78,7 @@ class AnalysisSampleSerializer(serializers.ModelSerializer):
         exclude = ('user',)
 
 
-class AnalysisSerializer(serializers.ModelSerializer):
+class AnalysisSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     signal = UserFilteredPrimaryKeyRelatedField(
         queryset=models.Signal.objects
     )
@@ -110,7 +145,7 @@ class SignalSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = models.Signal
-        exclude = ('user', )
+        exclude = ('user', 'manifest')
         read_only_fields = ('raw_file',)
 
 
@@ -148,6 +183,7 @@ class FilteredSignalSerializer(serializers.Serializer):
             process=process,
             frequency=signal.frequency,
             unit=signal.unit,
+            storage_format=signal.storage_format,
             user=signal.user,
         )
 
@@ -176,7 +212,7 @@ class DatasetSerializer(serializers.ModelSerializer):
         exclude = ('user',)
 
 
-class SessionDetailSerializer(serializers.ModelSerializer):
+class SessionDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     datasets = DatasetSerializer(many=True, read_only=True)
     analysis_samples = AnalysisSampleSerializer(many=True, read_only=True)
 
@@ -186,7 +222,7 @@ class SessionDetailSerializer(serializers.ModelSerializer):
         read_only_fields = ('datasets', 'analysis_samples')
 
 
-class SessionListCreateSerializer(serializers.ModelSerializer):
+class SessionListCreateSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     datasets = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
 
     class Meta:
@@ -194,7 +230,7 @@ class SessionListCreateSerializer(serializers.ModelSerializer):
         exclude = ('user',)
 
 
-class SubjectListSerializer(serializers.ModelSerializer):
+class SubjectListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     sessions = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
 
     class Meta:
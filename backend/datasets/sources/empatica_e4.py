@@ -2,7 +2,7 @@ import re
 import pandas as pd
 import numpy as np
 
-from datasets.constants import signal_types
+from datasets.constants import signal_types, storage_formats
 from datasets.utils import is_zero_file
 from datasets.sources.source_base import SourceBase
 
@@ -156,17 +156,20 @@ class EmpaticaE4Source(SourceBase):
             if is_zero_file(path):
                 continue
 
+            storage_format = storage_formats.PARQUET
             if raw_file.name == 'IBI.csv':
                 data = self.read_ibi(path)
             elif raw_file.name == 'tags.csv':
                 data = self.read_tags(path)
             else:
                 data = self.read_default(path, self.FILES[raw_file.name])
+                storage_format = storage_formats.RAW
 
             for name, series in data.items():
                 result[name] = {
                     'series': series,
-                    'raw_file_id': raw_file.id
+                    'raw_file_id': raw_file.id,
+                    'storage_format': storage_format
                 }
 
         if 'acc_x' in result:
@@ -180,7 +183,8 @@ class EmpaticaE4Source(SourceBase):
                 axis=0
             )
             result['acc_mag'] = {
-                'series': pd.Series(data=data, index=index, name='acc_mag')
+                'series': pd.Series(data=data, index=index, name='acc_mag'),
+                'storage_format': storage_formats.RAW
             }
 
         for name, meta in self.META.items():
@@ -2,7 +2,7 @@ import re
 import pandas as pd
 import numpy as np
 
-from datasets.constants import signal_types
+from datasets.constants import signal_types, storage_formats
 from datasets.sources.source_base import SourceBase
 
 import logging
@@ -374,6 +374,11 @@ class EverionSource(SourceBase):
                 'series': pd.Series(data=data, index=index, name='acc_mag')
             }
 
+        # high frequency sensor signals
+        for name in [*sum(self.SENSOR_TAGS.values(), []), 'acc_mag']:
+            if name in result:
+                result[name]['storage_format'] = storage_formats.RAW
+
         if 'gsr_electrode' in result:
             # convert kOhm to uSiemens
             result['gsr_electrode']['series'] = (1 / (result['gsr_electrode']['series'] * 1000)) * 1e6
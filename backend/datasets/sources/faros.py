@@ -4,7 +4,7 @@ import numpy as np
 import pyedflib
 from datetime import datetime
 
-from datasets.constants import signal_types
+from datasets.constants import signal_types, storage_formats
 from datasets.utils import create_series
 from datasets.sources.source_base import SourceBase
 
@@ -79,7 +79,8 @@ class FarosSource(SourceBase):
         result = {
             signal: {
                 'raw_file_id': raw_file.id,
-                'series': data[signal]
+                'series': data[signal],
+                'storage_format': storage_formats.RAW
             }
             for signal
             in data.keys()
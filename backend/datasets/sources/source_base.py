@@ -62,6 +62,9 @@ class SourceBase(ABC):
         Returns a dict with meta information and parsed signal data.
         Parsed data has to be passed as Series with tz-aware DateTimeIndex.
         If no signal type is given, it will be set to signal_type.OTHER.
+        Sampled signals may choose storage_formats.RAW to store regular
+        chunks as memory-mappable value arrays with an implicit time index and
+        irregular chunks with delta-encoded timestamps.
 
         Source file objects can be accessed via self.raw_files.
 
@@ -72,7 +75,8 @@ class SourceBase(ABC):
                 'raw_file_id': "4079f31e-5daf-472c-86d4-a2a30142b843",
                 'series': <pandas.Series>,
                 'frequency': 51.2,
-                'unit': "Milliseconds"
+                'unit': "Milliseconds",
+                'storage_format': "PQ"
             },
             ...
         }
@@ -0,0 +1,359 @@
+import os
+import json
+import struct
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import fastparquet
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from datasets.metrics import CHUNK_READS
+
+# Shared by all requests of a process, so concurrent wide reads cannot
+# open more than SIGNAL_READ_WORKERS files at once.
+READ_EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.SIGNAL_READ_WORKERS,
+    thread_name_prefix='chunk-read',
+)
+
+# Runs whole signal reads of batch requests. These wait for chunk reads on
+# READ_EXECUTOR, so they must not run on it themselves.
+SIGNAL_EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.SIGNAL_READ_WORKERS,
+    thread_name_prefix='signal-read',
+)
+
+@contextmanager
+def atomic_path(path):
+    """
+    Yields a temporary path next to `path` and moves it into place once the
+    block finished, so readers never observe partially written files and
+    existing memory maps keep the previous version.
+    """
+    folder = os.path.dirname(path)
+    if not os.path.exists(folder):
+        os.makedirs(folder, exist_ok=True)
+
+    temporary_path = f'{path}.{uuid.uuid4().hex[:8]}.tmp'
+    try:
+        yield temporary_path
+        os.replace(temporary_path, path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+
+# Candidate chunk lengths in seconds. All of them divide a day, so chunk
+# boundaries fall on round timestamps.
+CHUNK_LENGTHS = (60, 300, 600, 900, 1800, 3600, 7200, 10800, 21600, 43200, 86400)
+
+
+def chunk_length_for(frequency, sample_size, target_size):
+    """
+    Returns the longest candidate chunk length in seconds whose chunks of
+    `frequency` samples per second with `sample_size` bytes each stay
+    within `target_size` bytes.
+    """
+    if not frequency or frequency <= 0:
+        return CHUNK_LENGTHS[-1]
+    ideal_length = target_size / (frequency * sample_size)
+    fitting_lengths = [length for length in CHUNK_LENGTHS if length <= ideal_length]
+    return fitting_lengths[-1] if fitting_lengths else CHUNK_LENGTHS[0]
+
+
+def split_chunks(series, chunk_length):
+    """
+    Yields the non-empty slices of a series falling into consecutive chunks
+    of `chunk_length` seconds, aligned to multiples of the chunk length.
+    Boundaries are located with a single binary search over the sorted
+    index and the slices are views, so no masked copies are created.
+    """
+    if series.empty:
+        return
+    if not series.index.is_monotonic_increasing:
+        series = series.sort_index()
+
+    timestamps = series.index.asi8
+    length = int(chunk_length * 1e9)
+    first_boundary = timestamps[0] // length * length + length
+    boundaries = np.arange(first_boundary, timestamps[-1] + 1, length, dtype=np.int64)
+    positions = np.searchsorted(timestamps, boundaries, side='left')
+
+    lower = 0
+    for upper in [*positions, len(timestamps)]:
+        if upper > lower:
+            yield series.iloc[lower:upper]
+        lower = upper
+
+
+# Rows per parquet row group. Row groups carry min/max statistics of the
+# timestamp index, so narrow reads only decode the overlapping groups.
+ROW_GROUP_SIZE = 2 ** 14
+
+
+def write_parquet(path, data, row_group_size=ROW_GROUP_SIZE):
+    if isinstance(data, pd.Series):
+        data = data.to_frame()
+
+    with atomic_path(path) as temporary_path:
+        data.to_parquet(
+            temporary_path,
+            index=True,
+            engine='fastparquet',
+            compression='SNAPPY',
+            row_group_offsets=row_group_size,
+        )
+
+
+def _to_naive_datetime64(timestamp):
+    timestamp = pd.Timestamp(timestamp)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert(None)
+    return timestamp.to_datetime64()
+
+
+def read_parquet(path, start=None, end=None):
+    """
+    Reads a parquet file written by `write_parquet`, decoding only the row
+    groups whose timestamp statistics overlap [start, end].
+    """
+    parquet_file = fastparquet.ParquetFile(path)
+    index_columns = parquet_file.pandas_metadata.get('index_columns', [])
+
+    filters = []
+    if len(parquet_file.row_groups) > 1 and len(index_columns) == 1 \
+            and isinstance(index_columns[0], str):
+        if start is not None and start > pd.Timestamp.min.tz_localize('UTC'):
+            filters.append((index_columns[0], '>=', _to_naive_datetime64(start)))
+        if end is not None and end < pd.Timestamp.max.tz_localize('UTC'):
+            filters.append((index_columns[0], '<=', _to_naive_datetime64(end)))
+
+    df = parquet_file.to_pandas(filters=filters or None)
+    if start is not None or end is not None:
+        df = df.truncate(start, end)
+    return df
+
+
+# Irregular chunks store their timestamps as int64 nanosecond differences
+# to the previous sample in this column. The first value is absolute.
+TIMESTAMP_DELTA_COLUMN = '_timestamp_delta'
+
+
+def write_parquet_delta(path, data, row_group_size=ROW_GROUP_SIZE):
+    if isinstance(data, pd.Series):
+        data = data.to_frame()
+
+    timestamps = data.index.tz_convert('UTC').asi8 if data.index.tz else data.index.asi8
+    frame = data.reset_index(drop=True)
+    frame[TIMESTAMP_DELTA_COLUMN] = np.diff(timestamps, prepend=0)
+    with atomic_path(path) as temporary_path:
+        frame.to_parquet(
+            temporary_path,
+            index=False,
+            engine='fastparquet',
+            compression='SNAPPY',
+            row_group_offsets=row_group_size,
+        )
+
+
+def read_parquet_delta(path, start=None, end=None):
+    """
+    Reads a parquet file written by `write_parquet_delta`. The small delta
+    column is decoded first to locate [start, end], afterwards only the
+    row groups holding these rows are decoded.
+    """
+    parquet_file = fastparquet.ParquetFile(path)
+    value_columns = [
+        column for column in parquet_file.columns
+        if column != TIMESTAMP_DELTA_COLUMN
+    ]
+    deltas = parquet_file.to_pandas(columns=[TIMESTAMP_DELTA_COLUMN])
+    timestamps = np.cumsum(deltas[TIMESTAMP_DELTA_COLUMN].values)
+
+    lower = 0
+    upper = len(timestamps)
+    if start is not None:
+        lower = np.searchsorted(timestamps, pd.Timestamp(start).value, side='left')
+    if end is not None:
+        upper = np.searchsorted(timestamps, pd.Timestamp(end).value, side='right')
+    upper = max(lower, upper)
+
+    frames = []
+    row_offset = 0
+    for row_group in parquet_file.row_groups:
+        next_offset = row_offset + row_group.num_rows
+        if next_offset > lower and row_offset < upper:
+            frame = parquet_file.read_row_group_file(row_group, value_columns, {})
+            frames.append(frame.iloc[max(lower - row_offset, 0):upper - row_offset])
+        row_offset = next_offset
+
+    if frames:
+        df = pd.concat(frames)
+    else:
+        df = pd.DataFrame(columns=value_columns)
+    df.index = pd.DatetimeIndex(timestamps[lower:upper], tz='UTC')
+    return df
+
+
+# Raw chunk files start with RAW_MAGIC, the little-endian length of a JSON
+# header and the header itself, padded to a multiple of 64 bytes. The header
+# holds dtype, first timestamp and sampling period in nanoseconds, sample
+# count, timezone and column name. The values follow as a contiguous
+# little-endian array, so readers can memory-map it and slice by position.
+RAW_MAGIC = b'ALPSRAW1'
+
+
+def regular_period(index):
+    """
+    Returns the sampling period in nanoseconds if the DatetimeIndex is
+    strictly regular, otherwise None.
+    """
+    if len(index) < 2:
+        return None
+    diffs = np.diff(index.asi8)
+    period = diffs[0]
+    if period <= 0 or not (diffs == period).all():
+        return None
+    return int(period)
+
+
+def write_raw(path, data, period):
+    if isinstance(data, pd.DataFrame):
+        data = data.iloc[:, 0]
+
+    values = np.ascontiguousarray(data.values)
+    values = values.astype(values.dtype.newbyteorder('<'), copy=False)
+    header = json.dumps({
+        'dtype': values.dtype.str,
+        'first': int(data.index.asi8[0]),
+        'period': period,
+        'count': len(values),
+        'tz': str(data.index.tz) if data.index.tz else None,
+        'name': data.name,
+    }).encode()
+    prefix_length = len(RAW_MAGIC) + 4
+    header += b' ' * (-(prefix_length + len(header)) % 64)
+
+    with atomic_path(path) as temporary_path:
+        with open(temporary_path, 'wb') as file:
+            file.write(RAW_MAGIC)
+            file.write(struct.pack('<I', len(header)))
+            file.write(header)
+            file.write(values.tobytes())
+
+
+def read_raw_values(path, start=None, end=None):
+    """
+    Memory-maps a raw chunk file and returns the values between start and
+    end without parsing or copying them, along with the timestamp of the
+    first returned value and the sampling period, both in nanoseconds.
+    No index is built, so consumers only interested in values or positions
+    avoid the timestamp materialization entirely.
+    """
+    with open(path, 'rb') as file:
+        if file.read(len(RAW_MAGIC)) != RAW_MAGIC:
+            raise ValueError(f'{path} is not a raw chunk file.')
+        header_length, = struct.unpack('<I', file.read(4))
+        header = json.loads(file.read(header_length))
+
+    first = header['first']
+    period = header['period']
+    count = header['count']
+
+    lower = 0
+    upper = count
+    if start is not None:
+        lower = min(max(-((first - pd.Timestamp(start).value) // period), 0), count)
+    if end is not None:
+        upper = min(max((pd.Timestamp(end).value - first) // period + 1, lower), count)
+
+    values = np.memmap(
+        path,
+        dtype=np.dtype(header['dtype']),
+        mode='r',
+        offset=len(RAW_MAGIC) + 4 + header_length,
+        shape=(count,),
+    )
+    return values[lower:upper], first + lower * period, period, header
+
+
+def read_raw(path, start=None, end=None):
+    """
+    Returns the samples of a raw chunk file between start and end. The index
+    is rebuilt from the first timestamp and period for the selected slice
+    only, in UTC like the index of delta encoded parquet chunks, so that
+    chunks of both formats concatenate into one DatetimeIndex.
+    """
+    values, first, period, header = read_raw_values(path, start, end)
+    index = pd.DatetimeIndex(
+        first + np.arange(len(values), dtype=np.int64) * period,
+        tz='UTC',
+    )
+    name = header['name'] if header['name'] is not None else 0
+    return pd.DataFrame(
+        values[:, np.newaxis],
+        index=index,
+        columns=[name],
+        copy=False,
+    )
+
+
+# Packed sample blocks hold little-endian int64 nanosecond timestamps as
+# differences to the previous one and the values either as a numeric array
+# or, for text values, as a JSON list. Both parts are zlib compressed.
+TEXT_DTYPE = 'json'
+
+
+def pack_samples(series):
+    """
+    Returns the compressed timestamps, compressed values and value dtype
+    of a series for storage in a sample block.
+    """
+    index = series.index.tz_convert('UTC') if series.index.tz else series.index
+    deltas = np.diff(index.asi8, prepend=0).astype('<i8', copy=False)
+
+    if np.issubdtype(series.dtype, np.number):
+        values = series.values.astype(series.dtype.newbyteorder('<'), copy=False)
+        dtype = values.dtype.str
+        values = values.tobytes()
+    else:
+        dtype = TEXT_DTYPE
+        values = json.dumps(series.astype(str).tolist()).encode()
+    return zlib.compress(deltas.tobytes()), zlib.compress(values), dtype
+
+
+def unpack_samples(timestamps, values, dtype):
+    """
+    Returns the samples of a block packed by `pack_samples` as a dataframe
+    with a 'value' column and a UTC index.
+    """
+    timestamps = np.cumsum(np.frombuffer(zlib.decompress(timestamps), dtype='<i8'))
+    if dtype == TEXT_DTYPE:
+        values = np.array(json.loads(zlib.decompress(values)), dtype=object)
+    else:
+        values = np.frombuffer(zlib.decompress(values), dtype=np.dtype(dtype))
+    index = pd.DatetimeIndex(timestamps, tz='UTC', name='timestamp')
+    return pd.DataFrame({'value': values}, index=index)
+
+
+def _timed_read(chunk_file, start, end):
+    with CHUNK_READS.measure():
+        return chunk_file.get_samples(start, end)
+
+
+def read_chunks(chunk_files, start, end):
+    """
+    Reads the samples of multiple chunk files on the shared read executor
+    and returns them in the order of `chunk_files`.
+    """
+    if len(chunk_files) < 2 or settings.SIGNAL_READ_WORKERS < 2:
+        return [_timed_read(chunk_file, start, end) for chunk_file in chunk_files]
+
+    futures = [
+        READ_EXECUTOR.submit(_timed_read, chunk_file, start, end)
+        for chunk_file in chunk_files
+    ]
+    return [future.result() for future in futures]
@@ -2,9 +2,10 @@ import pandas as pd
 import numpy as np
 from celery import Task, shared_task
 from django.db import transaction
+from django.db.models import F
 
 from datasets.models import Dataset, Signal, Sample, Tag, SignalChunkFile, Analysis, Process
-from datasets.constants import process_status, signal_types
+from datasets.constants import process_status, signal_types, storage_formats
 
 import logging
 logger = logging.getLogger(__name__)
@@ -50,6 +51,7 @@ def save_parsed_signals(dataset, signals):
             last_timestamp=series.index.max(),
             y_min=y_min,
             y_max=y_max,
+            storage_format=data.get('storage_format', storage_formats.PARQUET),
             user_id=dataset.user_id,
         )
         signal.save()
@@ -113,7 +115,7 @@ def filter_signal(self, signal_id):
     if hasattr(signal, 'filtered_signal'):
         signal.filtered_signal.delete()
 
-    if signal.raw_signal.samples.count() > 0:
+    if signal.raw_signal.has_table_samples():
         signal.save_to_table(filtered_series)
     else:
         signal.save_to_files(filtered_series)
@@ -122,10 +124,20 @@ def filter_signal(self, signal_id):
     signal.y_max = filtered_series.max()
     signal.first_timestamp = filtered_series.first_valid_index()
     signal.last_timestamp = filtered_series.last_valid_index()
-    signal.save()
+    signal.version = F('version') + 1
+    signal.save(update_fields=['y_min', 'y_max', 'first_timestamp', 'last_timestamp', 'version'])
+    signal.refresh_from_db(fields=['version'])
 
     signal.process.status = process_status.PROCESSED
     signal.process.info = result_info
     signal.process.save()
 
     return signal_id
+
+
+@shared_task
+def bake_time_corrections(signal_ids):
+    for signal in Signal.objects.filter(id__in=signal_ids):
+        signal.bake_time_correction()
+
+    return signal_ids
@@ -1,3 +1,601 @@
-from django.test import TestCase
+import os
+import struct
+import tempfile
+import time
+import uuid
+from unittest import mock
+import numpy as np
+import pandas as pd
+import redis
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from datasets import models
+from datasets.bulk import (
+    BINARY_HEADER, BINARY_TRAILER, SAMPLE_RECORD, SAMPLE_ROW, BlockReader, SampleDecoder, _sample_blocks
+)
+from datasets.cache import RESPONSE_CACHE, ResponseCache
+from datasets.constants import storage_kinds
+from datasets.downsampling import lttb, lttb_downsample
+from datasets.storage import (
+    TEXT_DTYPE, pack_samples, read_raw, regular_period, split_chunks, unpack_samples, write_raw
+)
+
+
+def timestamps(offsets, start='2020-01-01 10:00', name=None):
+    # nanoseconds from start, as indexes built from date_range carry a freq
+    first = pd.Timestamp(start, tz='UTC').value
+    return pd.DatetimeIndex(first + np.asarray(offsets).astype(np.int64), tz='UTC', name=name)
+
+
+def create_dataset(username='user'):
+    user = models.User.objects.create(username=username)
+    subject = models.Subject.objects.create(identifier='subject', user=user)
+    session = models.Session.objects.create(title='session', date='2020-01-01', subject=subject, user=user)
+    return models.Dataset.objects.create(session=session, user=user)
+
+
+def use_temporary_media_root(test_case):
+    directory = tempfile.TemporaryDirectory()
+    media_root = override_settings(MEDIA_ROOT=directory.name)
+    media_root.enable()
+    test_case.addCleanup(directory.cleanup)
+    test_case.addCleanup(media_root.disable)
+
+
+def create_signal(dataset, series, name='ecg'):
+    signal = models.Signal.objects.create(
+        name=name,
+        dataset=dataset,
+        frequency=256,
+        first_timestamp=series.index[0],
+        last_timestamp=series.index[-1],
+        y_min=series.min(),
+        y_max=series.max(),
+        user=dataset.user,
+    )
+    signal.save_to_files(series)
+    return signal
+
+
+class RawChunkTests(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'chunk.raw')
+        index = timestamps(np.arange(1000) * 3906250)
+        self.series = pd.Series(np.arange(1000, dtype='int16'), index=index, name='ecg')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_regular_period(self):
+        index = self.series.index
+        self.assertEqual(regular_period(index), 3906250)
+        self.assertIsNone(regular_period(index[:1]))
+        self.assertIsNone(regular_period(index.delete(500)))
+        self.assertIsNone(regular_period(index[::-1]))
+
+    def test_round_trip(self):
+        write_raw(self.path, self.series, regular_period(self.series.index))
+        df = read_raw(self.path)
+        pd.testing.assert_frame_equal(df, self.series.to_frame())
+
+    def test_round_trip_keeps_instants_in_utc(self):
+        series = self.series.tz_convert('Europe/Berlin')
+        write_raw(self.path, series, regular_period(series.index))
+        df = read_raw(self.path)
+        self.assertEqual(str(df.index.tz), 'UTC')
+        pd.testing.assert_frame_equal(df, self.series.to_frame())
+
+    def test_read_range(self):
+        write_raw(self.path, self.series, regular_period(self.series.index))
+        start = self.series.index[100] + pd.Timedelta(1, 'ms')
+        end = self.series.index[200]
+        df = read_raw(self.path, start, end)
+        pd.testing.assert_frame_equal(df, self.series.truncate(start, end).to_frame())
+
+    def test_read_range_outside(self):
+        write_raw(self.path, self.series, regular_period(self.series.index))
+        self.assertTrue(read_raw(self.path, end=self.series.index[0] - pd.Timedelta(1, 's')).empty)
+        self.assertTrue(read_raw(self.path, start=self.series.index[-1] + pd.Timedelta(1, 's')).empty)
+
+
+class BinaryCopyTests(SimpleTestCase):
+
+    def setUp(self):
+        # COPY transfers timestamps in microseconds
+        index = timestamps(np.arange(1000) * 3907000, name='timestamp')
+        self.frame = pd.DataFrame({'value': np.random.randn(1000)}, index=index)
+        self.signal_id = uuid.uuid4()
+
+    def read_blocks(self, read_size=1000):
+        reader = BlockReader(_sample_blocks(self.frame['value'], self.signal_id))
+        return b''.join(iter(lambda: reader.read(read_size), b''))
+
+    def decode(self, data, write_size=1000):
+        decoder = SampleDecoder()
+        for lower in range(0, len(data), write_size):
+            decoder.write(data[lower:lower + write_size])
+        return decoder.to_frame()
+
+    def test_sample_rows(self):
+        data = self.read_blocks(read_size=777)
+        self.assertTrue(data.startswith(BINARY_HEADER))
+        self.assertTrue(data.endswith(BINARY_TRAILER))
+        rows = np.frombuffer(data[len(BINARY_HEADER):-len(BINARY_TRAILER)], dtype=SAMPLE_ROW)
+        self.assertTrue((rows['fields'] == 3).all())
+        self.assertTrue((rows['value'] == self.frame['value'].values).all())
+        self.assertTrue((rows['signal'] == np.void(self.signal_id.bytes)).all())
+
+    def test_round_trip(self):
+        rows = np.frombuffer(self.read_blocks()[len(BINARY_HEADER):-len(BINARY_TRAILER)], dtype=SAMPLE_ROW)
+        # the tuples PostgreSQL returns for a (timestamp, value) query
+        records = np.empty(len(rows), dtype=SAMPLE_RECORD)
+        records['fields'] = 2
+        for field in ('timestamp_length', 'timestamp', 'value_length', 'value'):
+            records[field] = rows[field]
+        data = BINARY_HEADER + records.tobytes() + BINARY_TRAILER
+
+        # tuples split across writes are decoded once complete
+        for write_size in (len(data), 1000, 7):
+            pd.testing.assert_frame_equal(self.decode(data, write_size), self.frame)
+
+    def test_header_extension(self):
+        header = BINARY_HEADER[:-4] + struct.pack('>i', 3) + b'abc'
+        frame = self.decode(header + BINARY_TRAILER, write_size=5)
+        self.assertTrue(frame.empty)
+
+    def test_invalid_copy(self):
+        with self.assertRaises(ValueError):
+            self.decode(b'NOTACOPY\n\xff\r\n\x00' + bytes(8))
+        with self.assertRaises(ValueError):
+            self.decode(BINARY_HEADER)
+
+
+class PackedSamplesTests(SimpleTestCase):
+
+    def setUp(self):
+        self.index = timestamps(np.cumsum(np.random.randint(1, 10 ** 9, 500)), name='timestamp')
+
+    def test_numeric_round_trip(self):
+        for dtype in ('float64', 'float32', 'int16'):
+            series = pd.Series(np.arange(500).astype(dtype), index=self.index, name='value')
+            timestamps, values, packed_dtype = pack_samples(series)
+            self.assertEqual(np.dtype(packed_dtype), np.dtype(dtype))
+            pd.testing.assert_frame_equal(unpack_samples(timestamps, values, packed_dtype), series.to_frame())
+
+    def test_text_round_trip(self):
+        series = pd.Series(['start', 'äöü', '', 'end'] * 125, index=self.index, name='value', dtype=object)
+        timestamps, values, dtype = pack_samples(series)
+        self.assertEqual(dtype, TEXT_DTYPE)
+        pd.testing.assert_frame_equal(unpack_samples(timestamps, values, dtype), series.to_frame())
+
+    def test_round_trip_in_utc(self):
+        series = pd.Series(np.arange(500.), index=self.index.tz_convert('Europe/Berlin'), name='value')
+        df = unpack_samples(*pack_samples(series))
+        self.assertEqual(str(df.index.tz), 'UTC')
+        self.assertTrue((df.index == self.index).all())
+
+
+class SplitChunksTests(SimpleTestCase):
+
+    def setUp(self):
+        # irregular timestamps with a gap longer than a chunk
+        offsets = np.concatenate([np.arange(0, 150, 0.7), np.arange(400, 450, 1.3)])
+        index = timestamps(offsets * 1e9, start='2020-01-01 10:00:30')
+        self.series = pd.Series(np.arange(len(index), dtype=float), index=index)
+
+    def test_round_trip(self):
+        chunks = list(split_chunks(self.series, 60))
+        pd.testing.assert_series_equal(pd.concat(chunks), self.series)
+
+    def test_chunks_are_aligned(self):
+        length = pd.Timedelta(60, 's').value
+        chunks = list(split_chunks(self.series, 60))
+        # 10:00:30 to 10:03:00 and 10:07:10 to 10:08:00, the gap has no chunks
+        self.assertEqual(len(chunks), 4)
+        for chunk in chunks:
+            self.assertFalse(chunk.empty)
+            self.assertEqual(chunk.index.asi8[0] // length, chunk.index.asi8[-1] // length)
+        for previous, chunk in zip(chunks, chunks[1:]):
+            self.assertLess(previous.index.asi8[-1] // length, chunk.index.asi8[0] // length)
+
+    def test_unsorted_and_empty(self):
+        chunks = list(split_chunks(self.series.iloc[::-1], 60))
+        pd.testing.assert_series_equal(pd.concat(chunks), self.series)
+        self.assertEqual(list(split_chunks(self.series.iloc[:0], 60)), [])
+
+
+class LTTBTests(SimpleTestCase):
+
+    @staticmethod
+    def reference_lttb(x, y, threshold):
+        # straightforward implementation of the original algorithm
+        every = (len(x) - 2) / (threshold - 2)
+        selected = [0]
+        for bucket in range(threshold - 2):
+            lower = int(bucket * every) + 1
+            upper = int((bucket + 1) * every) + 1
+            next_upper = min(int((bucket + 2) * every) + 1, len(x))
+            if bucket == threshold - 3:
+                next_x, next_y = x[-1], y[-1]
+            else:
+                next_x, next_y = x[upper:next_upper].mean(), y[upper:next_upper].mean()
+            previous = selected[-1]
+            areas = [
+                abs((x[previous] - next_x) * (y[i] - y[previous]) - (x[previous] - x[i]) * (next_y - y[previous]))
+                for i in range(lower, upper)
+            ]
+            selected.append(lower + int(np.argmax(areas)))
+        selected.append(len(x) - 1)
+        return np.array(selected)
+
+    def test_matches_reference(self):
+        random = np.random.RandomState(0)
+        for length, threshold in ((1000, 100), (1000, 3), (997, 101), (5000, 2000)):
+            x = np.cumsum(random.rand(length))
+            y = random.randn(length)
+            np.testing.assert_array_equal(lttb(x, y, threshold), self.reference_lttb(x, y, threshold))
+
+    def test_keeps_short_series(self):
+        x = np.arange(10.)
+        np.testing.assert_array_equal(lttb(x, x, 10), np.arange(10))
+        np.testing.assert_array_equal(lttb(x, x, 2), np.arange(10))
+
+    def test_uniform_weights(self):
+        x = np.arange(1000.)
+        y = np.sin(x / 20)
+        np.testing.assert_array_equal(lttb(x, y, 50, np.ones(1000)), lttb(x, y, 50))
+
+    def test_downsample_keeps_extremes(self):
+        index = pd.date_range('2020-01-01', periods=10000, freq='10ms', tz='UTC')
+        series = pd.Series(np.zeros(10000), index=index)
+        series.iloc[4321] = 100
+        series.iloc[8765] = -100
+        for time_weighted in (False, True):
+            downsampled = lttb_downsample(series, 100, time_weighted)
+            self.assertEqual(len(downsampled), 100)
+            self.assertTrue(downsampled.index.is_monotonic_increasing)
+            self.assertEqual(downsampled.max(), 100)
+            self.assertEqual(downsampled.min(), -100)
+            self.assertEqual(downsampled.index[0], index[0])
+            self.assertEqual(downsampled.index[-1], index[-1])
+
+
+class ResponseCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        self.cache = ResponseCache(None, timeout=60)
+        self.cache.client = mock.Mock()
+        self.cache.client.get.side_effect = redis.ConnectionError('unreachable')
+
+    def test_skips_unavailable_redis(self):
+        self.assertEqual(self.cache.get_or_render('key', lambda: b'content'), b'content')
+        self.assertEqual(self.cache.client.get.call_count, 1)
+        self.assertFalse(self.cache.available())
+
+        # later requests render without waiting for Redis
+        self.assertEqual(self.cache.get_or_render('key', lambda: b'content'), b'content')
+        self.cache.set('key', b'content')
+        self.assertEqual(self.cache.client.get.call_count, 1)
+        self.cache.client.set.assert_not_called()
+        self.cache.client.lock.assert_not_called()
+
+    def test_renders_after_max_wait(self):
+        cache = ResponseCache(None, timeout=60, lock_timeout=30, max_wait=0.2)
+        cache.client = mock.Mock()
+        cache.client.get.return_value = None
+        # another request holds the lock and does not finish rendering
+        cache.client.lock.return_value.acquire.return_value = False
+        cache.client.lock.return_value.locked.return_value = True
+
+        started = time.monotonic()
+        self.assertEqual(cache.get_or_render('key', lambda: b'content'), b'content')
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(cache.stats()['wait_timeouts'], 1)
+        cache.client.set.assert_called_once()
+
+    def test_retries_after_interval(self):
+        self.cache.get('key')
+        with mock.patch('datasets.cache.time.monotonic', return_value=time.monotonic() + ResponseCache.RETRY_INTERVAL):
+            self.assertTrue(self.cache.available())
+            self.cache.get('key')
+        self.assertEqual(self.cache.client.get.call_count, 2)
+
+
+class TimeCorrectionTests(TestCase):
+
+    def setUp(self):
+        dataset = create_dataset()
+        self.first = pd.Timestamp('2020-01-01 10:00', tz='UTC')
+        self.signal = models.Signal.objects.create(
+            name='ecg',
+            dataset=dataset,
+            first_timestamp=self.first,
+            last_timestamp=self.first + pd.Timedelta(1, 'h'),
+            user=dataset.user,
+        )
+        self.timestamps = pd.DatetimeIndex([
+            self.first,
+            self.first + pd.Timedelta(90, 's'),
+            self.first + pd.Timedelta(1, 'h'),
+        ])
+
+    @staticmethod
+    def correct(timestamps, timeshift, stretch_factor, reference_time):
+        return (timestamps - reference_time) * stretch_factor + reference_time + timeshift
+
+    def test_composed_corrections(self):
+        second_reference = self.first + pd.Timedelta(30, 'min')
+        self.signal.correct_timestamps(pd.Timedelta(10, 's'), 2)
+        self.signal.correct_timestamps(pd.Timedelta(-3, 's'), 0.5, second_reference)
+        expected = self.correct(
+            self.correct(self.timestamps, pd.Timedelta(10, 's'), 2, self.first),
+            pd.Timedelta(-3, 's'), 0.5, second_reference
+        )
+
+        signal = models.Signal.objects.get(pk=self.signal.pk)
+        self.assertEqual(signal.version, 2)
+        self.assertEqual(signal.first_timestamp, expected[0])
+        self.assertEqual(signal.last_timestamp, expected[-1])
+        for raw, corrected in zip(self.timestamps, expected):
+            self.assertEqual(signal.to_corrected_time(raw), corrected)
+            self.assertEqual(signal.to_raw_time(corrected), raw)
+
+        df = pd.DataFrame({'value': [1., 2., 3.]}, index=self.timestamps)
+        df = signal.apply_time_correction(df)
+        self.assertTrue((df.index == expected).all())
+
+    def test_without_correction(self):
+        self.assertFalse(self.signal.has_time_correction())
+        self.assertEqual(self.signal.to_raw_time(self.first), self.first)
+        df = pd.DataFrame({'value': [1., 2., 3.]}, index=self.timestamps)
+        self.assertTrue((self.signal.apply_time_correction(df).index == self.timestamps).all())
+
+
+class BakeTimeCorrectionTests(TestCase):
+
+    def setUp(self):
+        use_temporary_media_root(self)
+        index = timestamps(np.arange(256 * 60) * 3906250)
+        self.series = pd.Series(np.arange(len(index), dtype=float), index=index, name='ecg')
+        self.signal = create_signal(create_dataset(), self.series)
+
+    def test_bake(self):
+        self.signal.correct_timestamps(pd.Timedelta(10, 's'), 2)
+        self.signal.bake_time_correction()
+
+        signal = models.Signal.objects.get(pk=self.signal.pk)
+        self.assertFalse(signal.has_time_correction())
+        df = signal.samples_dataframe()
+        expected = (self.series.index - self.series.index[0]) * 2 + self.series.index[0] + pd.Timedelta(10, 's')
+        self.assertTrue((df.index == expected).all())
+        self.assertTrue((df['ecg'].values == self.series.values).all())
+
+    def test_bake_corrects_aggregates(self):
+        self.signal.correct_timestamps(pd.Timedelta(10, 's'), 2)
+        aggregate_file = self.signal.get_coarsest_aggregate_file(10 ** 9)
+        expected = self.signal.aggregates_dataframe(aggregate_file, self.signal.first_timestamp, self.signal.last_timestamp)
+        self.signal.bake_time_correction()
+
+        signal = models.Signal.objects.get(pk=self.signal.pk)
+        aggregate_file = signal.get_coarsest_aggregate_file(10 ** 9)
+        df = signal.aggregates_dataframe(aggregate_file, signal.first_timestamp, signal.last_timestamp)
+        pd.testing.assert_frame_equal(df, expected, check_names=False)
+
+    def test_failed_bake_keeps_files(self):
+        self.signal.correct_timestamps(pd.Timedelta(10, 's'))
+        files = {
+            path: os.path.getmtime(path)
+            for path in self.signal_file_paths()
+        }
+        with mock.patch.object(models.Signal, 'update_manifest', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.signal.bake_time_correction()
+
+        self.assertEqual({path: os.path.getmtime(path) for path in self.signal_file_paths()}, files)
+        signal = models.Signal.objects.get(pk=self.signal.pk)
+        self.assertTrue(signal.has_time_correction())
+        self.assertTrue((signal.samples_dataframe().index == self.series.index + pd.Timedelta(10, 's')).all())
+
+    def signal_file_paths(self):
+        directory = os.path.dirname(self.signal.signal_chunk_files.first().path.path)
+        return [os.path.join(directory, name) for name in os.listdir(directory)]
+
+    def test_bake_after_concurrent_correction(self):
+        self.signal.correct_timestamps(pd.Timedelta(10, 's'))
+        apply_time_correction = models.Signal.apply_time_correction
+        corrections = []
+
+        def correct_concurrently(signal, df):
+            if not corrections:
+                # commits while the first correction is being baked
+                corrections.append(models.Signal.objects.get(pk=signal.pk))
+                corrections[0].correct_timestamps(pd.Timedelta(5, 's'))
+            return apply_time_correction(signal, df)
+
+        with mock.patch.object(models.Signal, 'apply_time_correction', correct_concurrently):
+            self.signal.bake_time_correction()
+
+        signal = models.Signal.objects.get(pk=self.signal.pk)
+        self.assertFalse(signal.has_time_correction())
+        self.assertEqual(signal.signal_chunk_files.count(), 1)
+        df = signal.samples_dataframe()
+        self.assertTrue((df.index == self.series.index + pd.Timedelta(15, 's')).all())
+
+
+class ReplaceChunkFilesTests(TestCase):
+
+    def setUp(self):
+        use_temporary_media_root(self)
+        index = timestamps(np.arange(256 * 60) * 3906250)
+        self.series = pd.Series(np.arange(len(index), dtype=float), index=index, name='ecg')
+        dataset = create_dataset()
+        self.signal = models.Signal.objects.create(
+            name='ecg',
+            dataset=dataset,
+            first_timestamp=index[0],
+            last_timestamp=index[-1],
+            user=dataset.user,
+        )
+        self.signal.save_to_files(self.series, chunk_length=20)
+
+    def test_replace(self):
+        previous_files = list(self.signal.signal_chunk_files.all())
+        self.assertEqual(len(previous_files), 3)
+        data = pd.concat([chunk_file.read() for chunk_file in previous_files[:2]])
+        self.signal.replace_chunk_files(previous_files[:2], data)
+
+        self.assertEqual(self.signal.signal_chunk_files.count(), 2)
+        df = self.signal.samples_dataframe()
+        self.assertTrue((df.index == self.series.index).all())
+
+    def test_replace_after_bake(self):
+        previous_files = list(self.signal.signal_chunk_files.all())
+        data = pd.concat([chunk_file.read() for chunk_file in previous_files[:2]])
+        self.signal.correct_timestamps(pd.Timedelta(10, 's'))
+        self.signal.bake_time_correction()
+        chunk_paths = set(self.signal.signal_chunk_files.values_list('path', flat=True))
+        files = set(os.listdir(os.path.dirname(self.signal.signal_chunk_files.first().path.path)))
+
+        with self.assertRaises(models.ChunkFilesChanged):
+            self.signal.replace_chunk_files(previous_files[:2], data)
+
+        self.assertEqual(set(self.signal.signal_chunk_files.values_list('path', flat=True)), chunk_paths)
+        self.assertEqual(set(os.listdir(os.path.dirname(self.signal.signal_chunk_files.first().path.path))), files)
+        df = self.signal.samples_dataframe()
+        self.assertTrue((df.index == self.series.index + pd.Timedelta(10, 's')).all())
+
+
+class AggregateFileTests(TestCase):
+
+    def setUp(self):
+        use_temporary_media_root(self)
+        index = timestamps(np.arange(256 * 60) * 3906250)
+        self.series = pd.Series(np.arange(len(index), dtype=float), index=index, name='ecg')
+        self.signal = create_signal(create_dataset(), self.series)
+
+    def test_rebuilt_aggregates_use_new_files(self):
+        previous_paths = set(self.signal.aggregate_files.values_list('path', flat=True))
+        self.signal.save_aggregates(self.series)
+        paths = set(self.signal.aggregate_files.values_list('path', flat=True))
+        self.assertEqual(len(paths), len(models.SignalAggregateFile.WINDOWS))
+        # previous files are removed on commit, which must not hit the new ones
+        self.assertFalse(paths & previous_paths)
+        for aggregate_file in self.signal.aggregate_files.all():
+            self.assertTrue(os.path.exists(aggregate_file.path.path))
+
+
+class SampleApiTests(APITestCase):
+
+    def setUp(self):
+        use_temporary_media_root(self)
+        # responses are rendered without Redis
+        patcher = mock.patch.object(RESPONSE_CACHE, 'client', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.dataset = create_dataset()
+        index = timestamps(np.arange(256 * 60) * 3906250)
+        self.series = pd.Series(np.sin(np.arange(len(index)) / 100), index=index, name='ecg')
+        self.signal = create_signal(self.dataset, self.series)
+        self.client.force_authenticate(self.dataset.user)
+
+    def test_batch_serves_found_signals(self):
+        other = create_signal(self.dataset, self.series, name='other')
+        foreign = create_signal(create_dataset('other user'), self.series)
+        missing = uuid.uuid4()
+        response = self.client.get('/api/signals/samples/', {
+            'signals': f'{self.signal.id},{missing},{other.id},{foreign.id}',
+            'max_samples': 100,
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(list(data), [str(self.signal.id), str(missing), str(other.id), str(foreign.id)])
+        single = self.client.get(f'/api/signals/{self.signal.id}/samples/', {'max_samples': 100}).json()
+        self.assertEqual(data[str(self.signal.id)], single)
+        self.assertEqual(data[str(other.id)], single)
+        self.assertEqual(data[str(missing)], {'detail': 'Not found.'})
+        self.assertEqual(data[str(foreign.id)], {'detail': 'Not found.'})
+
+    def test_lazy_manifest_keeps_version(self):
+        # signals stored before manifests existed
+        models.Signal.objects.filter(pk=self.signal.pk).update(manifest=None)
+        version = models.Signal.objects.get(pk=self.signal.pk).version
+
+        url = f'/api/signals/{self.signal.id}/samples/'
+        first = self.client.get(url)
+        second = self.client.get(url)
+        self.assertEqual(first['ETag'], second['ETag'])
+        signal = models.Signal.objects.get(pk=self.signal.pk)
+        self.assertEqual(signal.version, version)
+        self.assertEqual(signal.manifest['kind'], storage_kinds.CHUNKS)
+
+    def test_samples_not_modified(self):
+        url = f'/api/signals/{self.signal.id}/samples/'
+        response = self.client.get(url, {'max_samples': 100})
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get(url, {'max_samples': 100}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+        response = self.client.get(url, {'max_samples': 200}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_batch_response_shape(self):
+        other = create_signal(self.dataset, self.series, name='other')
+        params = {
+            'signals': f'{self.signal.id},{other.id}',
+            'start': '2020-01-01T10:00:10Z',
+            'end': '2020-01-01T10:00:20Z',
+            'max_samples': 100,
+        }
+        response = self.client.get('/api/signals/samples/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        for samples in response.json().values():
+            self.assertEqual(set(samples), {'downsampled', 'window', 'data'})
+            self.assertTrue(samples['downsampled'])
+            self.assertLessEqual(len(samples['data']), 100)
+
+        response = self.client.get('/api/signals/samples/', params, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_batch_requires_signals(self):
+        response = self.client.get('/api/signals/samples/', {'signals': 'ecg'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_bounds(self):
+        url = f'/api/signals/{self.signal.id}/export/'
+        response = self.client.get(url, {'start': 'yesterday-ish'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), ['start must be a timestamp'])
+
+        response = self.client.get(url, {'start': '2020-01-01T10:00:10Z', 'end': '2020-01-01T10:00:11Z'})
+        self.assertEqual(response.status_code, 200)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'timestamp,value')
+        self.assertEqual(len(lines) - 1, 257)
+        self.assertTrue(lines[1].startswith('2020-01-01 10:00:10'))
+
+
+class SparseFieldsTests(APITestCase):
+
+    def setUp(self):
+        self.dataset = create_dataset()
+        self.client.force_authenticate(self.dataset.user)
+
+    def test_fields(self):
+        response = self.client.get('/api/sessions/', {'fields': 'id,title'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{'id': str(self.dataset.session.id), 'title': self.dataset.session.title}])
+
+    def test_unknown_fields(self):
+        response = self.client.get('/api/sessions/', {'fields': 'id,secret,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'fields': ['Unknown fields: password, secret']})
@@ -19,8 +19,11 @@ urlpatterns = [
     path('datasets/<uuid:dataset>/files/', views.RawFileCreate.as_view()),
     path('datasets/<uuid:dataset>/parse/', views.DatasetReparse.as_view()),
 
+    path('signals/samples/', views.SampleBatchList.as_view()),
     path('signals/<uuid:pk>/', views.SignalDetail.as_view()),
     path('signals/<uuid:signal>/samples/', views.SampleList.as_view()),
+    path('signals/<uuid:signal>/tiles/<int:level>/<int:index>/', views.SampleTile.as_view()),
+    path('signals/<uuid:pk>/export/', views.SignalExport.as_view()),
 
     path('analysis/', views.AnalysisListCreate.as_view()),
     path('analysis/<uuid:pk>/', views.AnalysisDetail.as_view()),
@@ -35,6 +38,8 @@ urlpatterns = [
 
     path('sync/', views.Synchronization.as_view()),
     path('filter/', views.FilterSignal.as_view()),
+
+    path('stats/', views.StorageStats.as_view()),
 ]
 
 urlpatterns = format_suffix_patterns(urlpatterns)
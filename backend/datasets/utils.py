@@ -2,6 +2,8 @@ import os
 import operator
 import pandas as pd
 
+from datasets.constants import storage_formats
+
 def raw_file_path(instance, filename):
     path = "{username}/{dataset}/raw/{filename}.{ext}".format(
         username=instance.user.username,
@@ -12,10 +14,21 @@ def raw_file_path(instance, filename):
     return path
 
 def signal_file_path(instance, _):
-    path = "{username}/{dataset}/{signal}/{filename}.parquet".format(
+    path = "{username}/{dataset}/{signal}/{filename}.{ext}".format(
+        username=instance.user.username,
+        dataset=instance.signal.dataset_id,
+        signal=str(instance.signal_id)[:8],
+        filename=str(instance.id)[:8],
+        ext=storage_formats.EXTENSIONS[instance.format],
+    )
+    return path
+
+def signal_aggregate_file_path(instance, _):
+    path = "{username}/{dataset}/{signal}/aggregate_{window}s_{filename}.parquet".format(
         username=instance.user.username,
         dataset=instance.signal.dataset_id,
         signal=str(instance.signal_id)[:8],
+        window=instance.window,
         filename=str(instance.id)[:8],
     )
     return path
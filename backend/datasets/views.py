@@ -1,6 +1,9 @@
+import copy
+import hashlib
 import logging
 import math
 import operator
+import uuid
 import inspect
 from distutils.util import strtobool
 from functools import reduce
@@ -9,20 +12,35 @@ import pandas as pd
 import numpy as np
 from django.db import transaction, connection
 from django.db.models import Q
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, urlencode
 from rest_framework import exceptions, generics, views
-from rest_framework.permissions import IsAuthenticated, DjangoModelPermissions
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, DjangoModelPermissions
+from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
 from . import serializers
 from . import models # Dataset, Subject, Session, Signal, Source, AnalysisSample,
 from .constants import signal_types
-from .tasks import parse_raw_files, start_analysis, filter_signal
+from .tasks import parse_raw_files, start_analysis, filter_signal, bake_time_corrections
+from .pagination import OptionalCursorPagination
 from .parsers import MultiFileParser, JSONURLParser
 from .permissions import IsOwner, IsSessionOwner, IsDatasetOwner
 from .constants import process_status
 from .registries import FILTER_METHOD_REGISTRY
+from .aggregation import merge_aggregates
+from .downsampling import (
+    MINMAX, LTTB, MODES as DOWNSAMPLING_MODES, minmax_buckets, merge_buckets, lttb_downsample
+)
+from .cache import CHUNK_CACHE, RESPONSE_CACHE
+from .encoding import dumps
+from .metrics import CHUNK_READS, SIGNAL_READS
+from .prefetch import PREFETCHER, neighbour_windows
+from .renderers import ORJSONRenderer, SampleArrayRenderer
+from .storage import SIGNAL_EXECUTOR
 
 LOGGER = logging.getLogger(__name__)
 
@@ -34,6 +52,7 @@ class SourceList(generics.ListAPIView):
 
 class SubjectListCreate(generics.ListCreateAPIView):
     serializer_class = serializers.SubjectListSerializer
+    pagination_class = OptionalCursorPagination
 
     def get_queryset(self):
         return models.Subject.objects.filter(user=self.request.user)
@@ -50,6 +69,7 @@ class SubjectDetail(generics.RetrieveUpdateDestroyAPIView):
 
 class SessionListCreate(generics.ListCreateAPIView):
     serializer_class = serializers.SessionListCreateSerializer
+    pagination_class = OptionalCursorPagination
     permission_classes = (IsAuthenticated, IsOwner)
     parser_classes = (JSONURLParser,)
 
@@ -169,20 +189,158 @@ class SignalDetail(generics.RetrieveAPIView):
     permission_classes = (IsAuthenticated, IsOwner)
 
 
+def ts_from_query_params(request, param, fallback=None):
+    ts = request.query_params.get(param, None)
+    if ts:
+        try:
+            ts = pd.to_datetime(ts, utc=True)
+        except (ValueError, OverflowError):
+            raise exceptions.ValidationError(f'{param} must be a timestamp')
+    else:
+        ts = fallback
+    return ts
+
+
 class SampleList(generics.ListAPIView):
     permission_classes = (IsAuthenticated, IsOwner)
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [SampleArrayRenderer]
+
+    # renderer formats whose encoded responses are cached
+    CACHED_FORMATS = ('json', SampleArrayRenderer.format)
+    # query parameters not affecting the samples of a signal
+    UNCACHED_PARAMS = (api_settings.URL_FORMAT_OVERRIDE, 'prefetch')
+    # whether ?prefetch=true renders neighbouring windows in the background
+    PREFETCH = True
+    # defaults of the query parameters, filled in for cache keys so that
+    # equivalent requests share responses
+    PARAM_DEFAULTS = {
+        'mode': MINMAX,
+        'dtype': 'float64',
+        'normalize': 'false',
+        'max_samples': '2000',
+        'stretch_factor': '1',
+        'timeshift': '0',
+    }
 
     def list(self, request, *args, **kwargs):
         signal = get_object_or_404(models.Signal, pk=self.kwargs['signal'])
         self.check_object_permissions(self.request, signal)
 
-        normalize = bool(strtobool(request.query_params.get('normalize', 'false')))
-        max_samples = int(request.query_params.get('max_samples', 2000))
+        cache_key = self.get_cache_key(signal)
+        etag = '"{}"'.format(hashlib.md5(cache_key.encode()).hexdigest())
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponseNotModified()
+        elif request.accepted_renderer.format not in self.CACHED_FORMATS:
+            response = Response(self.get_samples_data(request, signal))
+        else:
+            content = RESPONSE_CACHE.get_or_render(cache_key, lambda: self.render_samples(signal))
+            response = HttpResponse(content, content_type=request.accepted_renderer.media_type)
+
+        if self.PREFETCH and strtobool(request.query_params.get('prefetch', 'false')) \
+                and request.accepted_renderer.format in self.CACHED_FORMATS:
+            self.prefetch_neighbours(signal)
+
+        response['ETag'] = etag
+        self.patch_response_headers(response, signal)
+        return response
+
+    def render_samples(self, signal):
+        return self.request.accepted_renderer.render(
+            self.get_samples_data(self.request, signal),
+            self.request.accepted_media_type,
+            self.get_renderer_context()
+        )
+
+    def prefetch_neighbours(self, signal):
+        """
+        Renders and caches the responses for the neighbouring grid windows
+        of the requested one in the background, which also loads their
+        chunks into the chunk cache of this process.
+        """
+        start = self.get_ts_from_query_params('start')
+        end = self.get_ts_from_query_params('end')
+        if start is None or end is None:
+            return
+
+        for window_start, window_end in neighbour_windows(start, end):
+            params = self.request.query_params.copy()
+            params['start'] = window_start.isoformat()
+            params['end'] = window_end.isoformat()
+            http_request = copy.copy(self.request._request)
+            http_request.GET = params
+            request = Request(http_request)
+            request.user = self.request.user
+            request.accepted_renderer = self.request.accepted_renderer
+            request.accepted_media_type = self.request.accepted_media_type
+            view = copy.copy(self)
+            view.request = request
+
+            cache_key = view.get_cache_key(signal)
+            if not PREFETCHER.submit(
+                self.request.user.id,
+                lambda view=view, cache_key=cache_key: RESPONSE_CACHE.get_or_render(
+                    cache_key, lambda: view.render_samples(signal)
+                )
+            ):
+                return
+
+    def patch_response_headers(self, response, signal):
+        patch_vary_headers(response, ['Accept'])
+
+    def get_cache_key(self, signal):
+        """
+        Identifies a response by signal version, renderer and the
+        normalised query parameters.
+        """
+        return 'samples:{}:{}:{}:{}'.format(
+            signal.id,
+            signal.version,
+            self.request.accepted_media_type,
+            urlencode(self.get_cache_params()),
+        )
+
+    def get_cache_params(self):
+        """
+        Returns the sorted query parameters affecting the samples with
+        defaults filled in, timestamps as nanoseconds since the epoch and
+        numbers and flags in a canonical form.
+        """
+        params = dict(self.PARAM_DEFAULTS)
+        params.update(
+            (key, value)
+            for key, value in self.request.query_params.items()
+            if key not in self.UNCACHED_PARAMS and value != ''
+        )
+        for param in ('start', 'end', 'reference_time'):
+            if param in params:
+                params[param] = self.get_ts_from_query_params(param).value
+        try:
+            params['normalize'] = bool(strtobool(params['normalize']))
+            params['max_samples'] = int(params['max_samples'])
+            params['stretch_factor'] = float(params['stretch_factor'])
+            params['timeshift'] = float(params['timeshift'])
+        except ValueError as error:
+            raise exceptions.ValidationError(str(error))
+        return sorted(params.items())
+
+    def get_samples_data(self, request, signal):
+        as_arrays = isinstance(request.accepted_renderer, SampleArrayRenderer)
+        if as_arrays and signal.type == signal_types.TAGS:
+            raise exceptions.NotAcceptable('Tag signals are only available as JSON')
+        mode = request.query_params.get('mode', self.PARAM_DEFAULTS['mode'])
+        if mode not in DOWNSAMPLING_MODES:
+            raise exceptions.ValidationError('mode must be minmax or lttb')
+        value_dtype = request.query_params.get('dtype', self.PARAM_DEFAULTS['dtype'])
+        if value_dtype not in ('float64', 'float32'):
+            raise exceptions.ValidationError('dtype must be float64 or float32')
+
+        normalize = bool(strtobool(request.query_params.get('normalize', self.PARAM_DEFAULTS['normalize'])))
+        max_samples = int(request.query_params.get('max_samples', self.PARAM_DEFAULTS['max_samples']))
         if math.isnan(max_samples):
             raise exceptions.ValidationError('max_samples must be a number')
 
-        stretch_factor = float(request.query_params.get('stretch_factor', 1))
-        timeshift = float(request.query_params.get('timeshift', 0))
+        stretch_factor = float(request.query_params.get('stretch_factor', self.PARAM_DEFAULTS['stretch_factor']))
+        timeshift = float(request.query_params.get('timeshift', self.PARAM_DEFAULTS['timeshift']))
         reference_time = start = self.get_ts_from_query_params('reference_time')
         should_adjust_timestamps = stretch_factor != 1 or timeshift != 0
         if should_adjust_timestamps and not reference_time:
@@ -203,24 +361,58 @@ class SampleList(generics.ListAPIView):
             end = pd.Timestamp.max.tz_localize('UTC')
 
         LOGGER.debug('SampleList %s: %s - %s', signal.name, start, end)
-        df = signal.samples_dataframe(start, end)
+        aggregate_file = None
+        if signal.type != signal_types.TAGS:
+            aggregate_file = signal.get_aggregate_file(start, end, max_samples)
+
+        if aggregate_file:
+            LOGGER.debug(
+                'SampleList %s reading %ss aggregates',
+                signal.name,
+                aggregate_file.window
+            )
+            df = signal.aggregates_dataframe(aggregate_file, start, end)
+        else:
+            df = signal.samples_dataframe(start, end)
 
         if df.empty:
-            return Response({
-                'downsampled': False,
-                'window': -1,
-                'data': []
-            })
+            return self.get_empty_data(as_arrays, value_dtype)
 
         if normalize and signal.type is not signal_types.TAGS:
-            df[df.columns[0]] = df[df.columns[0]] / np.max(np.abs([signal.y_min, signal.y_max]))
+            columns = ['min', 'max', 'mean'] if aggregate_file else df.columns[:1]
+            df[columns] = df[columns] / np.max(np.abs([signal.y_min, signal.y_max]))
 
         if should_adjust_timestamps:
             df = jointly.Synchronizer._stretch_signals(df, stretch_factor, reference_time)
             df = df.shift(1, freq=pd.Timedelta(timeshift, 's'))
 
         window = -1
-        if signal.type is not signal_types.TAGS and len(df) > max_samples:
+        ranged = False
+        if mode == LTTB and signal.type is not signal_types.TAGS and len(df) > max_samples:
+            LOGGER.debug(
+                'SampleList %s selecting %s of %s samples',
+                signal.name,
+                max_samples,
+                len(df)
+            )
+            window = (df.index[-1] - df.index[0]).value / 1e9 / max_samples
+            df = lttb_downsample(
+                df['mean'] if aggregate_file else df,
+                max_samples,
+                time_weighted=signal.type in [signal_types.NN_INTERVAL, signal_types.RR_INTERVAL]
+            ).to_frame()
+        elif aggregate_file:
+            min_index = df.index[0]
+            max_index = df.index[-1] + pd.Timedelta(seconds=aggregate_file.window)
+            length = max_index - min_index
+            freq = max(
+                math.ceil((length.value / 1e3) / (max_samples - 1)),
+                aggregate_file.window * 1000000
+            )
+            window = freq / 1e6
+            ranged = True
+            df = merge_aggregates(df, f'{freq}U')[['min', 'max', 'mean']]
+        elif signal.type is not signal_types.TAGS and len(df) > max_samples:
             LOGGER.debug(
                 'SampleList %s resampling from %s to %s',
                 signal.name,
@@ -231,30 +423,38 @@ class SampleList(generics.ListAPIView):
             max_index = df.index[df.size - 1]
             length = max_index - min_index
             freq = math.ceil((length.value / 1e3) / (max_samples - 1))
-            offset = f'{freq}U'
             window = freq / 1e6
-            resampler = df.resample(offset)
-            resampled_min = resampler.min()
-            resampled_max = resampler.max()
-            resampled_mean = resampler.mean()
-            df = pd.DataFrame(
-                columns=['range', 'mean'],
-                index=resampled_mean.index.copy(),
-            )
-            df['range'] = resampled_min.iloc[:, 0].combine(
-                resampled_max.iloc[:, 0],
-                func=lambda x, y: [x, y] if x and y else None
-            ).values
-            df['mean'] = resampled_mean.values
+            ranged = True
+            df = minmax_buckets(df, freq * 1000)
 
         LOGGER.debug(
             'SampleList %s prepare dataframe for response',
             signal.name
         )
+        return self.get_response_data(df, window, ranged, as_arrays, value_dtype)
+
+    def get_empty_data(self, as_arrays, value_dtype):
+        if as_arrays:
+            return {
+                'downsampled': False,
+                'window': -1,
+                'columns': {'x': np.empty(0), 'y': np.empty(0, dtype=value_dtype)},
+            }
+        return {
+            'downsampled': False,
+            'window': -1,
+            'data': []
+        }
+
+    def get_response_data(self, df, window, ranged, as_arrays, value_dtype):
+        """
+        Returns the response data for samples with a `timestamp` index and
+        either a value column or, if `ranged`, min, max and mean columns.
+        """
         df.dropna(inplace=True) # after resampling we might have created rows with null values, which are not JSON compliant
         df.reset_index(inplace=True)
 
-        if window > 0:
+        if ranged:
             rename_map = dict(zip([df.columns[0]], ['x']))
         else:
             rename_map = dict(zip(df.columns, ['x', 'y']))
@@ -266,22 +466,211 @@ class SampleList(generics.ListAPIView):
 
         # convert datetimeindex to unix timestamps
         df['x'] = df['x'].astype('int') / 1e6
-        df['x'] = df['x'].round(3)
 
-        LOGGER.debug('SampleList %s creating response', signal.name)
-        return Response({
+        if as_arrays:
+            value_columns = ['min', 'max', 'mean'] if ranged else ['y']
+            columns = {'x': df['x'].values}
+            for column in value_columns:
+                columns[column] = df[column].values.astype(value_dtype)
+            return {
+                'downsampled': window > 0,
+                'window': window,
+                'columns': columns,
+            }
+
+        df['x'] = df['x'].round(3)
+        if ranged:
+            df['range'] = [
+                [low, high] for low, high
+                in zip(df['min'].values, df['max'].values)
+            ]
+            df = df[['x', 'range', 'mean']]
+        return {
             'downsampled': window > 0,
             'window': window,
             'data': df.to_dict('records')
-        })
+        }
 
     def get_ts_from_query_params(self, param, fallback=None):
-        ts = self.request.query_params.get(param, None)
-        if ts:
-            ts = pd.to_datetime(ts, utc=True)
+        return ts_from_query_params(self.request, param, fallback)
+
+
+class SampleTile(SampleList):
+    """
+    Returns a tile of a fixed time grid, so that API clients requesting
+    overlapping windows share responses. The frontend plots request
+    SampleBatchList windows instead. At `level`, samples are summarised
+    into buckets of 2^level milliseconds and tile `index` covers
+    TILE_BUCKETS buckets starting at index * TILE_BUCKETS * 2^level ms
+    after the Unix epoch.
+    Tiles with fewer samples than buckets hold the samples themselves.
+    Passing the current signal `version` makes the response immutable for
+    browser caches, as a newer version changes the URL.
+    """
+    TILE_BUCKETS = 1024
+    MAX_LEVEL = 40
+    PREFETCH = False
+    BROWSER_CACHE_TIMEOUT = 365 * 24 * 60 * 60
+
+    def get_cache_key(self, signal):
+        return 'tiles:{}:{}:{}:{}:{}:{}'.format(
+            signal.id,
+            signal.version,
+            self.request.accepted_media_type,
+            self.kwargs['level'],
+            self.kwargs['index'],
+            self.request.query_params.get('dtype', 'float64'),
+        )
+
+    def get_samples_data(self, request, signal):
+        as_arrays = isinstance(request.accepted_renderer, SampleArrayRenderer)
+        if as_arrays and signal.type == signal_types.TAGS:
+            raise exceptions.NotAcceptable('Tag signals are only available as JSON')
+        value_dtype = request.query_params.get('dtype', 'float64')
+        if value_dtype not in ('float64', 'float32'):
+            raise exceptions.ValidationError('dtype must be float64 or float32')
+
+        level = self.kwargs['level']
+        if level > self.MAX_LEVEL:
+            raise Http404
+        width = 2 ** level * 1000000
+        origin = self.kwargs['index'] * width * self.TILE_BUCKETS
+        if origin + width * self.TILE_BUCKETS > pd.Timestamp.max.value:
+            raise Http404
+        start = pd.Timestamp(origin, tz='UTC')
+        end = pd.Timestamp(origin + width * self.TILE_BUCKETS - 1, tz='UTC')
+
+        aggregate_file = None
+        if signal.type != signal_types.TAGS:
+            aggregate_file = signal.get_coarsest_aggregate_file(width / 1e9)
+
+        ranged = False
+        if aggregate_file:
+            df = signal.aggregates_dataframe(aggregate_file, start, end)
+            if not df.empty:
+                df = merge_buckets(df, width, origin)
+                ranged = True
+        else:
+            df = signal.samples_dataframe(start, end)
+            if signal.type != signal_types.TAGS and len(df) > self.TILE_BUCKETS:
+                df = minmax_buckets(df, width, origin)
+                ranged = True
+
+        if df.empty:
+            return self.get_empty_data(as_arrays, value_dtype)
+        return self.get_response_data(df, width / 1e9 if ranged else -1, ranged, as_arrays, value_dtype)
+
+    def patch_response_headers(self, response, signal):
+        super().patch_response_headers(response, signal)
+        if self.request.query_params.get('version') == str(signal.version):
+            patch_cache_control(response, private=True, max_age=self.BROWSER_CACHE_TIMEOUT, immutable=True)
         else:
-            ts = fallback
-        return ts
+            patch_cache_control(response, private=True, no_cache=True)
+
+
+class SampleBatchList(SampleList):
+    """
+    Returns the samples of multiple signals for a shared window, given as
+    comma separated `signals` ids along with the SampleList parameters.
+    The response maps each signal id to its SampleList JSON response, and
+    the cache entries are shared with SampleList JSON responses. Ids of
+    signals which do not exist or belong to other users map to a not found
+    error, so that they do not fail the other signals of the batch.
+    """
+    MAX_SIGNALS = 50
+
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    UNCACHED_PARAMS = SampleList.UNCACHED_PARAMS + ('signals',)
+
+    def list(self, request, *args, **kwargs):
+        signal_ids = [
+            signal_id.strip()
+            for value in request.query_params.getlist('signals')
+            for signal_id in value.split(',')
+            if signal_id.strip()
+        ]
+        if not signal_ids:
+            raise exceptions.ValidationError('signals must be given')
+        if len(signal_ids) > self.MAX_SIGNALS:
+            raise exceptions.ValidationError(f'At most {self.MAX_SIGNALS} signals can be requested')
+        try:
+            signal_ids = list(dict.fromkeys(str(uuid.UUID(signal_id)) for signal_id in signal_ids))
+        except ValueError:
+            raise exceptions.ValidationError('signals must be signal ids')
+
+        signals = {
+            str(signal.id): signal
+            for signal in models.Signal.objects.filter(id__in=signal_ids, user=request.user)
+        }
+
+        cache_keys = {
+            signal_id: self.get_cache_key(signals[signal_id]) if signal_id in signals else f'missing:{signal_id}'
+            for signal_id in signal_ids
+        }
+        etag = '"{}"'.format(hashlib.md5(''.join(cache_keys.values()).encode()).hexdigest())
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponseNotModified()
+        else:
+            futures = {
+                signal_id: SIGNAL_EXECUTOR.submit(self.render_signal, signal, cache_keys[signal_id])
+                for signal_id, signal in signals.items()
+            }
+            not_found = dumps({'detail': exceptions.NotFound.default_detail})
+            content = b','.join(
+                b'"%s":%s' % (
+                    signal_id.encode(),
+                    futures[signal_id].result() if signal_id in futures else not_found
+                )
+                for signal_id in signal_ids
+            )
+            response = HttpResponse(b'{%s}' % content, content_type='application/json')
+
+        if self.PREFETCH and strtobool(request.query_params.get('prefetch', 'false')) \
+                and request.accepted_renderer.format in self.CACHED_FORMATS:
+            for signal in signals.values():
+                self.prefetch_neighbours(signal)
+
+        response['ETag'] = etag
+        return response
+
+    def render_signal(self, signal, cache_key):
+        try:
+            return RESPONSE_CACHE.get_or_render(
+                cache_key,
+                lambda: ORJSONRenderer().render(self.get_samples_data(self.request, signal))
+            )
+        finally:
+            # executor threads would otherwise keep their connections open
+            connection.close()
+
+
+class SignalExport(views.APIView):
+    """
+    Streams all samples of a signal between the optional `start` and `end`
+    query parameters as CSV at full resolution, one stored chunk at a time.
+    """
+    http_method_names = ['get']
+    permission_classes = (IsAuthenticated, IsOwner)
+    # rows encoded at once, a chunk as CSV is several times its decoded size
+    CSV_ROWS = 2 ** 16
+
+    def get(self, request, pk, format=None):
+        signal = get_object_or_404(models.Signal, pk=pk)
+        self.check_object_permissions(request, signal)
+        # invalid bounds fail here, before the response starts streaming
+        start = ts_from_query_params(request, 'start')
+        end = ts_from_query_params(request, 'end')
+
+        def rows():
+            yield 'timestamp,value\n'
+            for df in signal.iter_samples(start, end):
+                for lower in range(0, len(df), self.CSV_ROWS):
+                    yield df.iloc[lower:lower + self.CSV_ROWS, 0].to_csv(header=False)
+
+        response = StreamingHttpResponse(rows(), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{signal.name}.csv"'
+        return response
 
 
 class AnalysisLabelListCreate(generics.ListCreateAPIView):
@@ -372,6 +761,7 @@ class AnalysisExport(views.APIView):
 
 class AnalysisListCreate(generics.ListCreateAPIView):
     serializer_class = serializers.AnalysisSerializer
+    pagination_class = OptionalCursorPagination
     permission_classes = (IsAuthenticated, IsOwner)
 
     def get_serializer(self, *args, **kwargs):
@@ -384,6 +774,9 @@ class AnalysisListCreate(generics.ListCreateAPIView):
 
     def get_queryset(self):
         queryset = models.Analysis.objects.filter(user=self.request.user)
+        fields = serializers.requested_fields(self.request)
+        if fields is not None and 'result' not in fields:
+            queryset = queryset.defer('result')
 
         session = self.request.query_params.get('session')
         if session is not None:
@@ -541,6 +934,7 @@ class Synchronization(views.APIView):
         if not params:
             raise exceptions.ValidationError('No synchronization parameters given')
 
+        signal_ids = []
         for dataset_id, values in params.items():
             dataset = get_object_or_404(queryset, id=dataset_id)
             timeshift = np.float(values.get('timeshift', 0))
@@ -550,5 +944,23 @@ class Synchronization(views.APIView):
                 stretch_factor=stretch_factor,
                 reference_time=reference_time
             )
+            signal_ids.extend(dataset.signals.values_list('id', flat=True))
+
+        if request.data.get('bake', False):
+            transaction.on_commit(lambda: bake_time_corrections.delay(signal_ids))
 
         return Response()
+
+
+class StorageStats(views.APIView):
+    http_method_names = ['get']
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return Response({
+            'chunk_cache': CHUNK_CACHE.stats(),
+            'response_cache': RESPONSE_CACHE.stats(),
+            'prefetch': PREFETCHER.stats(),
+            'chunk_reads': CHUNK_READS.stats(),
+            'signal_reads': SIGNAL_READS.stats(),
+        })
@@ -42,7 +42,9 @@ export const endpointArray = [authEndpoint, apiEndpoint, apiFileEndpoint];
 
 const CancelToken = axios.CancelToken;
 
-export const useDataApi = (initialUrl, initialData, processData) => {
+const getData = (url, config) => apiEndpoint.get(url, config);
+
+export const useDataApi = (initialUrl, initialData, processData, request = getData) => {
   const [url, setUrl] = useState(initialUrl);
   const [data, setData] = useState(initialData);
   const [isError, setIsError] = useState(false);
@@ -73,7 +75,7 @@ export const useDataApi = (initialUrl, initialData, processData) => {
         setIsLoading(true);
 
         try {
-          const response = await apiEndpoint.get(
+          const response = await request(
             url, { cancelToken: source.token }
           );
           let responseData = response.data;
@@ -101,7 +103,7 @@ export const useDataApi = (initialUrl, initialData, processData) => {
         source.cancel();
       };
     },
-    [url, processData, reloadTimestamp]
+    [url, processData, request, reloadTimestamp]
   );
 
   return [{ data, isError, isLoading, reload }, setUrl];
@@ -36,8 +36,70 @@ export const useSignal = (id) => {
   return state;
 };
 
-export const useSignalSamples = (id, domain, maxSamples = 2000) => {
-  const [state, setUrl] = useDataApi('', []);
+// Sample requests for the same window made while rendering are sent as one
+// batch request, at most SAMPLES_BATCH_SIZE signals each like the backend.
+const SAMPLES_BATCH_SIZE = 50;
+const SAMPLES_URL = /^signals\/([^/]+)\/samples\/\?(.*)$/;
+const pendingBatches = new Map();
+
+const sendBatch = (query) => {
+  const batch = pendingBatches.get(query);
+  pendingBatches.delete(query);
+
+  const ids = [...batch.keys()];
+  for (let i = 0; i < ids.length; i += SAMPLES_BATCH_SIZE) {
+    const batchIds = ids.slice(i, i + SAMPLES_BATCH_SIZE);
+    const queryParams = new URLSearchParams(query);
+    queryParams.append('signals', batchIds.join(','));
+    apiEndpoint.get(`signals/samples/?${queryParams.toString()}`).then(
+      (response) => batchIds.forEach((id) => {
+        // signals the batch could not serve map to an error, e.g. if deleted
+        const samples = response.data[id];
+        batch.get(id).forEach(({ resolve, reject }) => {
+          if (!samples || samples.detail) {
+            reject(new Error(samples ? samples.detail : 'Missing samples'));
+          } else {
+            resolve({ data: samples });
+          }
+        });
+      }),
+      (error) => batchIds.forEach((id) => {
+        batch.get(id).forEach(({ reject }) => reject(error));
+      })
+    );
+  }
+};
+
+// Takes the place of the single signal samples request of `url` in
+// useDataApi. Batch requests are not cancelled, as other signals share them.
+const getBatchedSamples = (url) => {
+  const [, id, query] = url.match(SAMPLES_URL);
+  return new Promise((resolve, reject) => {
+    if (!pendingBatches.has(query)) {
+      pendingBatches.set(query, new Map());
+      setTimeout(() => sendBatch(query));
+    }
+    const batch = pendingBatches.get(query);
+    if (!batch.has(id)) {
+      batch.set(id, []);
+    }
+    batch.get(id).push({ resolve, reject });
+  });
+};
+
+// Windows the backend prefetches neighbours of: three steps of a power of two
+// milliseconds, starting at a multiple of the step and covering [from, to].
+// Small pans and zooms then request exactly the bounds the backend prefetched.
+const GRID_STEPS = 3;
+
+const snapToGrid = (from, to) => {
+  const step = Math.max(2 ** Math.ceil(Math.log2(Math.max(to - from, 1))) / 2, 1);
+  const start = Math.floor(from / step) * step;
+  return [new Date(start), new Date(start + GRID_STEPS * step)];
+};
+
+export const useSignalSamples = (id, domain, maxSamples = 2000, prefetch = false) => {
+  const [state, setUrl] = useDataApi('', [], undefined, getBatchedSamples);
 
   useEffect(
     () => {
@@ -47,14 +109,22 @@ export const useSignalSamples = (id, domain, maxSamples = 2000) => {
         let url = `signals/${id}/samples/?`;
         let queryParams = new URLSearchParams();
 
-        queryParams.append('max_samples', maxSamples);
+        let from = subSeconds(new Date(Number(domain[0])), 1);
+        let to = addSeconds(new Date(Number(domain[1])), 1);
+        if (prefetch && isValid(from) && isValid(to)) {
+          // the grid window is up to three times the domain, so it gets
+          // more samples to keep the resolution within the domain
+          [from, to] = snapToGrid(from.getTime(), to.getTime());
+          queryParams.append('max_samples', Math.round(maxSamples * 1.5));
+          queryParams.append('prefetch', 'true');
+        } else {
+          queryParams.append('max_samples', maxSamples);
+        }
 
-        const from = subSeconds(new Date(Number(domain[0])), 1);
         if (from && isValid(from)) {
           queryParams.append('start', from.toISOString());
         }
 
-        const to = addSeconds(new Date(Number(domain[1])), 1);
         if (to && isValid(to)) {
           queryParams.append('end', to.toISOString());
         }
@@ -62,7 +132,7 @@ export const useSignalSamples = (id, domain, maxSamples = 2000) => {
         setUrl(url + queryParams.toString());
       }
     },
-    [id, domain, setUrl, maxSamples]
+    [id, domain, setUrl, maxSamples, prefetch]
   );
 
   return state;
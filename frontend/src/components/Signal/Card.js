@@ -52,6 +52,7 @@ SignalCard.propTypes = {
   plot: PropTypes.object.isRequired,
   tagSignal: PropTypes.string,
   closable: PropTypes.bool,
+  prefetch: PropTypes.bool,
   plotProps: PropTypes.object,
 };
 
@@ -59,9 +60,10 @@ SignalCard.defaultProps = {
   datasets: {},
   signals: {},
   closable: false,
+  prefetch: false,
 };
 
-function SignalCard ({ datasets, signals, plot, tagSignal, closable, plotProps, ...rest }) {
+function SignalCard ({ datasets, signals, plot, tagSignal, closable, prefetch, plotProps, ...rest }) {
   const classes = useStyles();
   const dispatch = useDispatch();
   const sources = useSelector(getSources);
@@ -94,7 +96,7 @@ function SignalCard ({ datasets, signals, plot, tagSignal, closable, plotProps,
 
   const { isPolling } = usePollingEffect(signal, SIGNAL_START_POLLING, SIGNAL_STOP_POLLING);
   const isPollingChanged = useCompare(isPolling);
-  const { data: samples, isError, isLoading, reload } = useSignalSamples(plot.signal, plotProps.domainX);
+  const { data: samples, isError, isLoading, reload } = useSignalSamples(plot.signal, plotProps.domainX, 2000, prefetch);
   const { data: { data: tags } } = useSignalSamples(tagSignal, plotProps.domainX);
 
   useEffect(() => {
@@ -89,6 +89,7 @@ function SessionPreprocess ({ match }) {
           plot={plot}
           elevation={6}
           tagSignal={plots.tags}
+          prefetch
           plotProps={{
             domainX: plots.domain,
             onAreaMarked: handleAreaMarked,